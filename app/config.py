@@ -10,8 +10,27 @@ class Settings(BaseSettings):
     app_name: str = "NoteKeep"
     database_url: str = f"sqlite:///{Path.cwd() / 'notekeep.db'}"
     telegram_bot_token: str | None = None
+    normalize_url_cache_size: int = 4096
+    preview_cache_size: int = 512
+    preview_cache_ttl: int = 600
+    threadpool_size: int = 100
+    db_pool_size: int = 20
+    # Derived from threadpool_size when unset, so every worker thread can hold a connection
+    db_max_overflow: int | None = None
 
 
 @lru_cache
 def get_settings() -> Settings:
     return Settings()
+
+
+def reload_settings() -> Settings:
+    """Drop the cached settings and re-read them from the environment."""
+    global settings
+    get_settings.cache_clear()
+    settings = get_settings()
+    return settings
+
+
+# Load eagerly so the first request does not pay for parsing the environment and .env file
+settings = get_settings()
@@ -1,20 +1,55 @@
 from __future__ import annotations
 
-import asyncio
-from collections.abc import Iterable, Sequence
-from datetime import datetime
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-from typing import TypedDict
-
-from sqlalchemy import func, select
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session, joinedload
-
-from .link_preview import fetch_link_metadata
-from .models import Collection, Link, Tag, link_tag_table, Note
+import time
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import Callable, Iterable, Sequence
+from datetime import date, datetime, time as dt_time, timedelta
+from functools import lru_cache
+from itertools import islice
+from urllib.parse import urlsplit
+from typing import Any, NamedTuple, TypedDict, TypeVar
+
+from slugify import slugify
+from sqlalchemy import (
+    ColumnElement,
+    Insert,
+    Integer,
+    Row,
+    ScalarResult,
+    String,
+    TextualSelect,
+    column,
+    delete,
+    desc,
+    event,
+    func,
+    or_,
+    select,
+    text,
+    tuple_,
+    type_coerce,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from .config import get_settings
+from .database import Base
+from .models import Collection, Link, Note, NoteImage, Tag, link_tag_table
 from .schemas import LinkCreate, LinkUpdate, NoteCreate, NoteUpdate
 
 DEFAULT_PAGE_SIZE = 25
+EXPORT_BATCH_SIZE = 500
+DATE_FORMAT = "%Y-%m-%d"
+# Trigram full-text search cannot match terms shorter than three characters
+FTS_MIN_TERM_LENGTH = 3
+
+# Read-only listings select just these columns instead of hydrating ORM objects
+TAG_ROW_COLUMNS = (Tag.id, Tag.name, Tag.slug, Tag.icon, Tag.color)
+COLLECTION_ROW_COLUMNS = (Collection.id, Collection.name, Collection.slug)
+TagRow = tuple[int, str, str, str | None, str | None]
+CollectionRow = tuple[int, str, str]
 
 
 class DefaultTagBase(TypedDict):
@@ -50,68 +85,104 @@ DEFAULT_TAG_ALIASES: dict[str, str] = {
 DEFAULT_TAG_SLUGS = [tag["slug"] for tag in DEFAULT_TAGS]
 DEFAULT_TAG_SLUG_SET = {tag["slug"] for tag in DEFAULT_TAGS}
 
+
+class TagSnapshot(NamedTuple):
+    """Detached, read-only copy of a tag that can be cached across sessions."""
+
+    id: int
+    name: str
+    slug: str
+    icon: str | None
+    color: str | None
+
+
+# get_default_tags results keyed by limit, as (expires_at, tags); dropped on every commit
+_default_tags_cache: dict[int, tuple[float, list[TagSnapshot]]] = {}
+
+
+def invalidate_tag_caches() -> None:
+    """Drop cached tag lookups after tags are created, renamed or deleted."""
+    _default_tags_cache.clear()
+
+
+_Listing = TypeVar("_Listing")
+
+# Prebuilt tag/collection listings keyed by name, as (expires_at, payload); dropped on every commit
+LISTING_CACHE_TTL = 30.0
+_listing_cache: dict[str, tuple[float, Any]] = {}
+
+
+def cached_listing(key: str, build: Callable[[], _Listing]) -> _Listing:
+    """Return the cached listing for ``key``, rebuilding it once it is older than the TTL."""
+    now = time.monotonic()
+    cached = _listing_cache.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    payload = build()
+    _listing_cache[key] = (now + LISTING_CACHE_TTL, payload)
+    return payload
+
+
+def invalidate_listing_caches() -> None:
+    """Drop cached listings so the next read sees the latest links, tags and collections."""
+    _listing_cache.clear()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_caches_after_commit(session: Session) -> None:
+    # Any committed write may add or remove a used tag or collection. Tag caches are also
+    # cleared here, because a reader may have refilled them between a writer's flush and commit
+    invalidate_listing_caches()
+    invalidate_tag_caches()
+
 # UTM parameters to strip when checking for duplicates
-UTM_PARAMS = {
+UTM_PARAMS = frozenset({
     'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
     'utm_id', 'utm_source_platform', 'utm_creative_format', 'utm_marketing_tactic'
-}
+})
 
 
+@lru_cache(maxsize=get_settings().normalize_url_cache_size)
 def normalize_url(url: str) -> str:
     """
     Normalize URL by removing UTM tracking parameters.
     This ensures URLs with different UTM parameters are treated as duplicates.
     """
-    try:
-        parsed = urlparse(url)
-        if not parsed.query:
-            return url
-
-        # Parse query parameters
-        params = parse_qs(parsed.query, keep_blank_values=True)
-
-        # Remove UTM parameters
-        filtered_params = {k: v for k, v in params.items() if k not in UTM_PARAMS}
-
-        # Rebuild query string
-        new_query = urlencode(filtered_params, doseq=True) if filtered_params else ''
-
-        # Rebuild URL
-        normalized = urlunparse((
-            parsed.scheme,
-            parsed.netloc,
-            parsed.path,
-            parsed.params,
-            new_query,
-            parsed.fragment
-        ))
-
-        return normalized
-    except Exception:
-        # If normalization fails, return original URL
+    # Everything after "#" is the fragment, even if it contains "?"
+    fragment_start = url.find("#")
+    if fragment_start == -1:
+        fragment_start = len(url)
+    query_start = url.find("?", 0, fragment_start)
+    # Every tracked parameter starts with "utm_", so URLs without it are already normalized
+    if query_start == -1 or "utm_" not in url[query_start:fragment_start]:
         return url
 
+    # Drop UTM pairs as text, so the remaining parameters keep their exact encoding and order
+    query = url[query_start + 1:fragment_start]
+    kept = [pair for pair in query.split("&") if pair.partition("=")[0] not in UTM_PARAMS]
+    new_query = "&".join(kept)
+    return url[:query_start] + (f"?{new_query}" if new_query else "") + url[fragment_start:]
+
 
+@lru_cache(maxsize=1024)
 def _normalize_tag(tag: str) -> str:
     normalized = tag.strip().lower()
     if normalized.startswith("youtu"):
         return "youtube"
-    alias_target = DEFAULT_TAG_ALIASES.get(normalized)
-    if alias_target:
-        return alias_target
-    if normalized in DEFAULT_TAG_SLUG_SET:
-        return normalized
-    return normalized
+    # Default slugs and unknown tags both map to themselves, so only aliases need a lookup
+    return DEFAULT_TAG_ALIASES.get(normalized, normalized)
 
 
-def infer_tags_from_url(url: str) -> set[str]:
+@lru_cache(maxsize=get_settings().normalize_url_cache_size)
+def infer_tags_from_url(url: str) -> frozenset[str]:
     """Infer tag slugs from a URL (e.g., instagram.com -> instagram)."""
     try:
-        parsed = urlparse(url)
-        host = (parsed.netloc or "").lower()
-        path = (parsed.path or "").lower()
-    except Exception:
-        return set()
+        # urlsplit skips the ;params parsing that urlparse does and that nothing here needs
+        parsed = urlsplit(url)
+    except ValueError:
+        return frozenset()
+    host = parsed.netloc.lower()
+    path = parsed.path.lower()
 
     inferred: set[str] = set()
 
@@ -121,28 +192,36 @@ def infer_tags_from_url(url: str) -> set[str]:
     if "youtube.com" in host or "youtu.be" in host or path.startswith("youtu.be"):
         inferred.add("youtube")
 
-    return inferred
+    # Frozen because cached results are shared between callers
+    return frozenset(inferred)
 
 
 def ensure_default_tags(session: Session) -> None:
     """Ensure the core default tags exist with consistent metadata."""
-    existing_tags = session.execute(select(Tag)).scalars().all()
-    if not existing_tags:
-        existing_tags = []
-
-    def _find_matching_tag(candidate: dict[str, str | list[str] | None]) -> Tag | None:
-        target_slug = candidate["slug"].lower()
-        target_name = candidate["name"].lower()
-        aliases = {alias.lower() for alias in (candidate.get("aliases") or [])}
-        for tag in existing_tags:
-            slug = (tag.slug or "").lower()
-            name = (tag.name or "").lower()
-            if slug == target_slug or name == target_name:
-                return tag
-            if slug in aliases or name in aliases:
-                return tag
+    candidates = {
+        key.lower()
+        for tag_def in DEFAULT_TAGS
+        for key in (tag_def["slug"], tag_def["name"], *(tag_def.get("aliases") or []))
+    }
+    existing_tags = (
+        session.execute(
+            select(Tag)
+            .where(Tag.slug.in_(candidates) | Tag.name_lower.in_(candidates))
+        )
+        .scalars()
+        .all()
+    )
+    tags_by_slug = {(tag.slug or "").lower(): tag for tag in existing_tags}
+    tags_by_name = {(tag.name or "").lower(): tag for tag in existing_tags}
+
+    def _find_matching_tag(candidate: DefaultTag) -> Tag | None:
+        for key in (candidate["slug"], candidate["name"], *(candidate.get("aliases") or [])):
+            match = tags_by_slug.get(key.lower()) or tags_by_name.get(key.lower())
+            if match:
+                return match
         return None
 
+    missing_defaults: list[dict[str, str | None]] = []
     for tag_def in DEFAULT_TAGS:
         match = _find_matching_tag(tag_def)
         if match:
@@ -159,79 +238,142 @@ def ensure_default_tags(session: Session) -> None:
             if updated:
                 session.add(match)
         else:
-            new_tag = Tag(
-                name=tag_def["name"],
-                slug="",
-                icon=tag_def.get("icon"),
-                color=tag_def.get("color"),
+            missing_defaults.append(
+                {
+                    "name": tag_def["name"],
+                    "slug": slugify(tag_def["name"]),
+                    "name_lower": tag_def["name"].lower(),
+                    "icon": tag_def.get("icon"),
+                    "color": tag_def.get("color"),
+                }
             )
-            session.add(new_tag)
-            existing_tags.append(new_tag)
 
+    if missing_defaults:
+        session.execute(_insert_ignoring_conflicts(session, Tag).values(missing_defaults))
     session.flush()
+    invalidate_tag_caches()
 
 
-def get_default_tags(session: Session, limit: int = 5) -> list[Tag]:
+def get_default_tags(session: Session, limit: int = 5) -> list[TagSnapshot]:
     """Return the default tags in their defined order, limited to the provided size."""
     if limit <= 0:
         return []
-    tags = session.execute(select(Tag)).scalars().all()
+    now = time.monotonic()
+    cached = _default_tags_cache.get(limit)
+    if cached is not None and cached[0] > now:
+        return list(cached[1])
+
+    lookup = select(Tag).where(Tag.slug.in_(DEFAULT_TAG_SLUGS))
+    tags = session.execute(lookup).scalars().all()
+    created = False
     if not tags:
         ensure_default_tags(session)
-        tags = session.execute(select(Tag)).scalars().all()
+        tags = session.execute(lookup).scalars().all()
+        created = True
     tags_by_slug = {(tag.slug or "").lower(): tag for tag in tags}
-    ordered: list[Tag] = []
+    ordered: list[TagSnapshot] = []
     for tag_def in DEFAULT_TAGS:
         slug = tag_def["slug"]
         match = tags_by_slug.get(slug)
         if match:
-            ordered.append(match)
+            ordered.append(TagSnapshot(match.id, match.name, match.slug, match.icon, match.color))
         if len(ordered) >= limit:
             break
+    # Tags created here are not committed yet, so only cache rows read back from the database
+    if not created:
+        _default_tags_cache[limit] = (now + LISTING_CACHE_TTL, ordered)
     return ordered
 
 
+def _insert_ignoring_conflicts(session: Session, model: type[Base]) -> Insert:
+    """Build an INSERT that silently skips rows whose name is already taken."""
+    # Only a duplicate name means the row already exists; a slug clash must not drop it silently
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql_insert(model).on_conflict_do_nothing(index_elements=["name"])
+    return sqlite_insert(model).on_conflict_do_nothing(index_elements=["name"])
+
+
+def _unused_slugs(session: Session, model: type[Base], names: Iterable[str]) -> dict[str, str]:
+    """Map each new name to its slug, adding a "-2", "-3", ... suffix where the slug is taken."""
+    wanted = {name: slugify(name) for name in names}
+    bases = set(wanted.values())
+    taken = set(session.scalars(select(model.slug).where(model.slug.in_(bases))))
+    if taken or len(bases) < len(wanted):
+        # Names such as "C" and "C++" share a slug, so collect the suffixes already in use
+        suffixed = or_(*(model.slug.startswith(f"{base}-") for base in bases))
+        taken.update(session.scalars(select(model.slug).where(suffixed)))
+    slugs: dict[str, str] = {}
+    for name, base in wanted.items():
+        slug, suffix = base, 2
+        while slug in taken:
+            slug = f"{base}-{suffix}"
+            suffix += 1
+        taken.add(slug)
+        slugs[name] = slug
+    return slugs
+
+
 def get_or_create_collection(session: Session, name: str | None) -> Collection | None:
     if not name:
         return None
     normalized = name.strip()
     if not normalized:
         return None
-    existing = session.execute(
-        select(Collection).where(func.lower(Collection.name) == func.lower(normalized))
-    ).scalar_one_or_none()
+    lookup = select(Collection).where(Collection.name_lower == normalized.lower())
+    existing = session.execute(lookup).scalar_one_or_none()
     if existing:
         return existing
-    collection = Collection(name=normalized, slug="")
-    session.add(collection)
-    try:
-        session.flush()
-    except IntegrityError:
-        session.rollback()
-        return session.execute(
-            select(Collection).where(func.lower(Collection.name) == func.lower(normalized))
-        ).scalar_one()
-    return collection
+    slug = _unused_slugs(session, Collection, [normalized])[normalized]
+    session.execute(
+        _insert_ignoring_conflicts(session, Collection).values(
+            name=normalized, slug=slug, name_lower=normalized.lower()
+        )
+    )
+    return session.execute(lookup).scalar_one()
 
 
 def get_or_create_tags(session: Session, tag_names: Iterable[str]) -> list[Tag]:
-    tags: list[Tag] = []
-    cleaned = {_normalize_tag(tag) for tag in tag_names if tag and tag.strip()}
+    cleaned = _clean_tag_names(tag_names)
     if not cleaned:
-        return tags
+        return []
+    return _get_or_create_tags_by_name(session, cleaned)
+
+
+def _clean_tag_names(tag_names: Iterable[str]) -> set[str]:
+    cleaned = {_normalize_tag(tag) for tag in tag_names if tag and tag.strip()}
 
     # Limit to maximum 4 tags
     if len(cleaned) > 4:
-        cleaned = set(list(cleaned)[:4])
-
-    existing = session.execute(select(Tag).where(func.lower(Tag.name).in_(cleaned))).scalars().all()
-    tags.extend(existing)
-    for tag in cleaned:
-        if not any(existing_tag.name.lower() == tag for existing_tag in tags if existing_tag.name):
-            new_tag = Tag(name=tag, slug="")
-            session.add(new_tag)
-            tags.append(new_tag)
-    return tags
+        cleaned = set(islice(cleaned, 4))
+    return cleaned
+
+
+def _get_or_create_tags_by_name(session: Session, names: Iterable[str]) -> list[Tag]:
+    """Return tags for already-normalized names, creating missing ones in a single INSERT."""
+    ordered = list(dict.fromkeys(names))
+    lookup = select(Tag).where(Tag.name_lower.in_(ordered))
+    tags_by_name = {tag.name.lower(): tag for tag in session.execute(lookup).scalars() if tag.name}
+    missing = [name for name in ordered if name not in tags_by_name]
+    if missing:
+        slugs = _unused_slugs(session, Tag, missing)
+        created = session.scalars(
+            _insert_ignoring_conflicts(session, Tag)
+            .values(
+                [
+                    {"name": name, "slug": slugs[name], "name_lower": name.lower()}
+                    for name in missing
+                ]
+            )
+            .returning(Tag)
+        )
+        tags_by_name.update((tag.name.lower(), tag) for tag in created)
+        invalidate_tag_caches()
+        if len(tags_by_name) < len(ordered):
+            # Rows skipped on conflict were inserted concurrently; pick them up as well
+            tags_by_name.update(
+                (tag.name.lower(), tag) for tag in session.execute(lookup).scalars() if tag.name
+            )
+    return [tags_by_name[name] for name in ordered if name in tags_by_name]
 
 
 def get_link_by_url(session: Session, url: str) -> Link | None:
@@ -239,51 +381,71 @@ def get_link_by_url(session: Session, url: str) -> Link | None:
     Check if a link with this URL already exists.
     URLs are normalized (UTM parameters removed) before comparison.
     """
-    from .models import Link
-    normalized_url = normalize_url(url)
+    return (
+        session.execute(select(Link).where(Link.normalized_url == normalize_url(url)).limit(1))
+        .scalars()
+        .first()
+    )
 
-    # Check all links and compare normalized URLs
-    all_links = session.query(Link).all()
-    for link in all_links:
-        if normalize_url(link.url) == normalized_url:
-            return link
 
-    return None
+def find_existing_normalized_urls(session: Session, urls: Iterable[str]) -> set[str]:
+    """Return the normalized forms of ``urls`` that already belong to a saved link."""
+    normalized = {normalize_url(url) for url in urls}
+    if not normalized:
+        return set()
+    existing = select(Link.normalized_url).where(Link.normalized_url.in_(normalized))
+    return set(session.scalars(existing))
 
 
 def create_link(session: Session, payload: LinkCreate) -> Link:
     collection = get_or_create_collection(session, payload.collection)
+    tags = get_or_create_tags(session, _link_tag_names(payload))
+    link = _new_link(payload, collection, tags)
+    session.add(link)
+    session.flush()
+    return link
+
+
+def create_links(session: Session, payloads: Sequence[LinkCreate]) -> list[Link]:
+    """Create several links at once, resolving their tags and collections in shared queries."""
+    tag_names = [_clean_tag_names(_link_tag_names(payload)) for payload in payloads]
+    all_tag_names = set().union(*tag_names)
+    tags_by_name = {
+        tag.name.lower(): tag
+        for tag in (_get_or_create_tags_by_name(session, all_tag_names) if all_tag_names else [])
+    }
+    collections: dict[str, Collection | None] = {}
+    links = []
+    for payload, names in zip(payloads, tag_names, strict=True):
+        collection_name = (payload.collection or "").strip().lower()
+        if collection_name not in collections:
+            collections[collection_name] = get_or_create_collection(session, payload.collection)
+        tags = [tags_by_name[name] for name in names if name in tags_by_name]
+        links.append(_new_link(payload, collections[collection_name], tags))
+    # One flush lets the ORM send the link and link_tags rows as batched INSERTs
+    session.add_all(links)
+    session.flush()
+    return links
 
+
+def _link_tag_names(payload: LinkCreate) -> list[str]:
     # Auto-apply tags based on known domains
     inferred_tags = infer_tags_from_url(str(payload.url))
-    combined_tags = list({*(payload.tags or []), *inferred_tags})
+    return list({*(payload.tags or []), *inferred_tags})
 
-    tags = get_or_create_tags(session, combined_tags)
 
-    # Fetch metadata when we need image or caption-backed notes
+def _new_link(payload: LinkCreate, collection: Collection | None, tags: list[Tag]) -> Link:
+    # Missing image and notes are filled in by the background metadata refresh
     image_url = payload.image_url
-    notes = payload.notes
-    metadata = None
-    need_metadata = (not image_url) or (not notes)
-    if need_metadata:
-        try:
-            metadata = asyncio.run(fetch_link_metadata(str(payload.url), timeout=5))
-            if metadata:
-                if not image_url and metadata.get("image"):
-                    image_url = metadata["image"]
-                if (not notes) and metadata.get("description"):
-                    notes = metadata["description"]
-        except Exception:
-            # If fetching fails, continue without metadata
-            pass
 
     # Set initial title to URL if not provided, will be updated by background task
     title = payload.title or str(payload.url)
 
-    link = Link(
+    return Link(
         url=str(payload.url),
+        normalized_url=normalize_url(str(payload.url)),
         title=title,
-        notes=notes,
+        notes=payload.notes,
         image_url=image_url,
         collection=collection,
         tags=tags,
@@ -292,17 +454,25 @@ def create_link(session: Session, payload: LinkCreate) -> Link:
         link_status="active",  # Assume active until proven otherwise
         last_checked_at=datetime.now(),
     )
-    session.add(link)
-    session.flush()
-    session.refresh(link)
-    return link
+
+
+def export_all_links(
+    session: Session, batch_size: int = EXPORT_BATCH_SIZE
+) -> ScalarResult[Link]:
+    """Return every link, newest first, fetched from the database in batches of ``batch_size``."""
+    return session.execute(
+        select(Link)
+        .options(selectinload(Link.tags), joinedload(Link.collection))
+        .order_by(Link.created_at.desc())
+        .execution_options(yield_per=batch_size)
+    ).scalars()
 
 
 def get_link(session: Session, link_id: int) -> Link | None:
     return session.get(
         Link,
         link_id,
-        options=[joinedload(Link.collection), joinedload(Link.tags)],
+        options=[joinedload(Link.collection), selectinload(Link.tags)],
     )
 
 
@@ -319,7 +489,6 @@ def update_link(session: Session, link: Link, payload: LinkUpdate) -> Link:
         link.tags = get_or_create_tags(session, payload.tags)
     session.add(link)
     session.flush()
-    session.refresh(link)
     return link
 
 
@@ -328,6 +497,86 @@ def delete_link(session: Session, link: Link) -> None:
     session.flush()
 
 
+def delete_link_by_id(session: Session, link_id: int) -> bool:
+    """Delete a link in a single statement, returning False if it did not exist."""
+    # Tag associations go with it through the link_tags ON DELETE CASCADE
+    deleted = session.execute(delete(Link).where(Link.id == link_id).returning(Link.id)).first()
+    return deleted is not None
+
+
+def _fts_available(session: Session, table: str) -> bool:
+    """Return True if the given full-text index table exists in the bound database."""
+    if session.get_bind().dialect.name != "sqlite":
+        return False
+    return (
+        session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": table},
+        ).first()
+        is not None
+    )
+
+
+def _fts_phrase_ids(table: str, search_term: str) -> TextualSelect:
+    """Select the rowids whose indexed text contains ``search_term`` as a substring."""
+    phrase = '"' + search_term.replace('"', '""') + '"'
+    return (
+        text(f"SELECT rowid FROM {table} WHERE {table} MATCH :phrase")
+        .bindparams(phrase=phrase)
+        .columns(column("rowid", Integer))
+    )
+
+
+def parse_date_param(value: str | None) -> date | None:
+    """Parse a YYYY-MM-DD form value, treating blank or malformed input as no filter."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, DATE_FORMAT).date()
+    except ValueError:
+        return None
+
+
+def _created_between(
+    model: type[Link] | type[Note], date_from: date | None, date_to: date | None
+) -> list[ColumnElement[bool]]:
+    """Filter on created_at as half-open datetime bounds so its index can be used."""
+    filters = []
+    if date_from:
+        filters.append(model.created_at >= datetime.combine(date_from, dt_time.min))
+    if date_to:
+        # Include the entire last day
+        day_after = datetime.combine(date_to + timedelta(days=1), dt_time.min)
+        filters.append(model.created_at < day_after)
+    return filters
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode the position after a row as an opaque keyset pagination cursor."""
+    return urlsafe_b64encode(f"{created_at.isoformat()}|{row_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a cursor from ``encode_cursor``, raising ValueError if it is malformed."""
+    # Bad base64, UTF-8, timestamps and ids all surface as ValueError subclasses
+    created_at, row_id = urlsafe_b64decode(cursor.encode()).decode().split("|")
+    return datetime.fromisoformat(created_at), int(row_id)
+
+
+def _created_before(
+    session: Session, model: type[Link] | type[Note], after: tuple[datetime, int]
+) -> ColumnElement[bool]:
+    """Select rows that come after the cursor in newest-first order."""
+    created_at, row_id = after
+    if session.get_bind().dialect.name == "sqlite":
+        # SQLite keeps timestamps as text, with no fraction when set by CURRENT_TIMESTAMP,
+        # so the cursor is compared in that same form to keep ties on the same second exact
+        timespec = "microseconds" if created_at.microsecond else "seconds"
+        stamp = created_at.replace(tzinfo=None).isoformat(sep=" ", timespec=timespec)
+        return tuple_(type_coerce(model.created_at, String), model.id) < tuple_(stamp, row_id)
+    return tuple_(model.created_at, model.id) < tuple_(created_at, row_id)
+
+
 def list_links(
     session: Session,
     *,
@@ -337,16 +586,23 @@ def list_links(
     collection: str | None = None,
     collections: list[str] | None = None,
     has_notes: bool | None = None,
-    date_from: str | None = None,
-    date_to: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
     broken: bool | None = None,
     page: int = 1,
     page_size: int = DEFAULT_PAGE_SIZE,
-) -> tuple[Sequence[Link], int]:
+    after: tuple[datetime, int] | None = None,
+    with_total: bool = True,
+) -> tuple[Sequence[Link], int | None]:
+    """List links newest first, paged by ``page`` or, when given, the keyset cursor ``after``.
+
+    The total is None when ``with_total`` is False and the page is read by cursor, which
+    leaves out the COUNT over every match.
+    """
     query = (
         select(Link)
-        .options(joinedload(Link.tags), joinedload(Link.collection))
-        .order_by(Link.created_at.desc())
+        .options(selectinload(Link.tags), joinedload(Link.collection))
+        .order_by(Link.created_at.desc(), Link.id.desc())
     )
     count_query = select(func.count(func.distinct(Link.id))).select_from(Link)
 
@@ -355,36 +611,43 @@ def list_links(
     if search:
         search_term = search.strip()
         if search_term:
-            base_pattern = f"%{search_term.lower()}%"
-            search_expression = (
-                func.lower(Link.title).like(base_pattern)
-                | func.lower(Link.url).like(base_pattern)
-                | func.lower(Link.notes).like(base_pattern)
-            )
+            if len(search_term) >= FTS_MIN_TERM_LENGTH and _fts_available(session, "links_fts"):
+                # Trigram FTS5 matches substrings like the LIKE fallback, but through an index
+                search_expression = Link.id.in_(_fts_phrase_ids("links_fts", search_term))
+            else:
+                base_pattern = f"%{search_term.lower()}%"
+                search_expression = (
+                    Link.title_lower.like(base_pattern)
+                    | Link.url_lower.like(base_pattern)
+                    | Link.notes_lower.like(base_pattern)
+                )
 
             tag_term = search_term.lstrip("#").strip()
             if tag_term:
                 tag_pattern = f"%{tag_term.lower()}%"
-                search_expression = (
-                    search_expression
-                    | Link.tags.any(func.lower(Tag.name).like(tag_pattern))
-                    | Link.tags.any(func.lower(Tag.slug).like(tag_pattern))
+                # Resolve matching tags once instead of correlating two EXISTS per link row
+                tagged_link_ids = (
+                    select(link_tag_table.c.link_id)
+                    .join(Tag, Tag.id == link_tag_table.c.tag_id)
+                    .where(Tag.name_lower.like(tag_pattern) | Tag.slug.like(tag_pattern))
                 )
+                search_expression = search_expression | Link.id.in_(tagged_link_ids)
 
             filters.append(search_expression)
 
+    # Slugs are stored lowercased by slugify, so compare them directly to keep their indexes usable
     # Support both single tag and multiple tags for backward compatibility
     if tag:
         lowered_tag = tag.lower()
         query = query.join(Link.tags)
         count_query = count_query.join(Link.tags)
-        filters.append(func.lower(Tag.slug) == lowered_tag)
+        filters.append(Tag.slug == lowered_tag)
     elif tags and len(tags) > 0:
         # Filter links that have ALL selected tags (AND logic)
         query = query.join(Link.tags)
         count_query = count_query.join(Link.tags)
         lowered_tags = [t.lower() for t in tags]
-        filters.append(func.lower(Tag.slug).in_(lowered_tags))
+        filters.append(Tag.slug.in_(lowered_tags))
         # Group by link ID and ensure it has all selected tags
         query = query.group_by(Link.id).having(
             func.count(func.distinct(Tag.id)) >= len(lowered_tags)
@@ -395,13 +658,13 @@ def list_links(
         lowered_collection = collection.lower()
         query = query.join(Link.collection)
         count_query = count_query.join(Link.collection)
-        filters.append(func.lower(Collection.slug) == lowered_collection)
+        filters.append(Collection.slug == lowered_collection)
     elif collections and len(collections) > 0:
         # Filter links that belong to any of the selected collections (OR logic)
         query = query.join(Link.collection)
         count_query = count_query.join(Link.collection)
         lowered_collections = [c.lower() for c in collections]
-        filters.append(func.lower(Collection.slug).in_(lowered_collections))
+        filters.append(Collection.slug.in_(lowered_collections))
 
     # Advanced filters
     if has_notes is not None:
@@ -411,24 +674,7 @@ def list_links(
         else:
             filters.append((Link.notes.is_(None)) | (Link.notes == ""))
 
-    # Date range filters
-    if date_from:
-        try:
-            from datetime import datetime
-            date_obj = datetime.strptime(date_from, "%Y-%m-%d")
-            filters.append(Link.created_at >= date_obj)
-        except ValueError:
-            pass  # Ignore invalid date format
-
-    if date_to:
-        try:
-            from datetime import datetime, timedelta
-            date_obj = datetime.strptime(date_to, "%Y-%m-%d")
-            # Include the entire day by adding 1 day
-            end_of_day = date_obj + timedelta(days=1)
-            filters.append(Link.created_at < end_of_day)
-        except ValueError:
-            pass  # Ignore invalid date format
+    filters.extend(_created_between(Link, date_from, date_to))
 
     # Broken links filter
     if broken:
@@ -438,88 +684,142 @@ def list_links(
         query = query.where(*filters)
         count_query = count_query.where(*filters)
 
-    total = session.execute(count_query).scalar_one()
+    if after is not None:
+        # Keyset paging seeks straight to the cursor; the total still covers every match
+        results = session.execute(
+            query.where(_created_before(session, Link, after)).limit(page_size)
+        ).scalars().all()
+        if not with_total:
+            return results, None
+        return results, session.execute(count_query).scalar_one()
 
+    # Compute the total alongside the page so the filters are only planned and run once
     offset = max(page - 1, 0) * page_size
-    results = (
-        session.execute(query.limit(page_size).offset(offset))
-        .unique()
-        .scalars()
+    rows = (
+        session.execute(
+            query.add_columns(func.count().over().label("total"))
+            .limit(page_size)
+            .offset(offset)
+        )
         .all()
     )
+    results = [row[0] for row in rows]
+    if rows:
+        total = rows[0][1]
+    elif offset:
+        # Past the last page the window has no rows to report on
+        total = session.execute(count_query).scalar_one()
+    else:
+        total = 0
     return results, total
 
 
 def has_broken_links(session: Session) -> bool:
     """Check if there are any broken links in the database."""
-    count = session.execute(
-        select(func.count(Link.id))
-        .where(Link.link_status.in_(["broken", "unreachable", "error"]))
-    ).scalar_one()
-    return count > 0
+    # EXISTS stops at the first match instead of counting every broken link
+    broken = select(Link.id).where(Link.link_status.in_(["broken", "unreachable", "error"]))
+    return session.execute(select(broken.exists())).scalar_one()
 
 
-def list_tags(session: Session) -> Sequence[Tag]:
+def list_tags(session: Session) -> Sequence[Row[TagRow]]:
     """Return a list of all tags that are associated with at least one link."""
-    return (
-        session.query(Tag)
-        .join(link_tag_table)
+    return session.execute(
+        select(*TAG_ROW_COLUMNS)
+        .join(link_tag_table, Tag.id == link_tag_table.c.tag_id)
         .group_by(Tag.id)
-        .order_by(func.lower(Tag.name))
-        .all()
-    )
+        .order_by(Tag.name_lower)
+    ).all()
 
 
-def list_all_tags(session: Session) -> Sequence[Tag]:
+def list_all_tags(session: Session) -> Sequence[Row[TagRow]]:
     """Return a list of all tags, regardless of whether they are used."""
-    return session.query(Tag).order_by(func.lower(Tag.name)).all()
+    return session.execute(select(*TAG_ROW_COLUMNS).order_by(Tag.name_lower)).all()
 
 
 def get_top_tags(session: Session, limit: int = 5) -> list[Tag]:
     """Get most frequently used tags, ordered by usage count."""
-    from sqlalchemy import desc
-
-    tag_counts = (
+    return list(
         session.execute(
-            select(Tag, func.count(link_tag_table.c.link_id).label('usage_count'))
+            select(Tag)
             .join(link_tag_table, Tag.id == link_tag_table.c.tag_id)
             .group_by(Tag.id)
-            .order_by(desc('usage_count'), Tag.name)
+            .order_by(desc(func.count(link_tag_table.c.link_id)), Tag.name)
             .limit(limit)
         )
+        .scalars()
         .all()
     )
-    return [tag for tag, count in tag_counts]
 
 
-def list_collections(session: Session) -> Sequence[Collection]:
+def list_collections(session: Session) -> Sequence[Row[CollectionRow]]:
     """Return a list of all collections that are associated with at least one link."""
-    return (
-        session.query(Collection)
-        .join(Link)
+    return session.execute(
+        select(*COLLECTION_ROW_COLUMNS)
+        .join(Link, Collection.id == Link.collection_id)
         .group_by(Collection.id)
-        .order_by(func.lower(Collection.name))
-        .all()
-    )
+        .order_by(Collection.name_lower)
+    ).all()
 
 
-def list_all_collections(session: Session) -> Sequence[Collection]:
+def list_all_collections(session: Session) -> Sequence[Row[CollectionRow]]:
     """Return a list of all collections."""
-    return session.query(Collection).order_by(func.lower(Collection.name)).all()
+    return session.execute(select(*COLLECTION_ROW_COLUMNS).order_by(Collection.name_lower)).all()
 
 
 def list_collections_with_counts(session: Session) -> Sequence[tuple[Collection, int]]:
     """Return a list of all collections with their link counts."""
-    collection_counts = (
-        session.execute(
-            select(Collection, func.count(Link.id).label("count"))
-            .outerjoin(Link, Collection.id == Link.collection_id)
-            .group_by(Collection.id)
-            .order_by(Collection.name)
-        )
-        .all()
+    return session.execute(
+        select(Collection, func.count(Link.id).label("count"))
+        .outerjoin(Link, Collection.id == Link.collection_id)
+        .group_by(Collection.id)
+        .order_by(Collection.name)
+    ).all()
+
+
+class CollectionSnapshot(NamedTuple):
+    """Detached, read-only copy of a collection that can be cached across sessions."""
+
+    id: int
+    name: str
+    slug: str
+
+
+class LinksSidebar(NamedTuple):
+    """Tag and collection data shown alongside the links page."""
+
+    tags: Sequence[Row[TagRow]]
+    collections: list[CollectionSnapshot]
+    collection_summaries: list[tuple[CollectionSnapshot, int]]
+    has_broken_links: bool
+
+
+def load_links_sidebar(session: Session) -> LinksSidebar:
+    """Load everything the links page sidebar needs, reusing the cached copy while it is fresh."""
+    return cached_listing("links_sidebar", lambda: _build_links_sidebar(session))
+
+
+def _build_links_sidebar(session: Session) -> LinksSidebar:
+    counted = session.execute(
+        select(*COLLECTION_ROW_COLUMNS, func.count(Link.id))
+        .outerjoin(Link, Collection.id == Link.collection_id)
+        .group_by(Collection.id)
+        .order_by(Collection.name)
+    ).all()
+    collection_summaries = [
+        (CollectionSnapshot(collection_id, name, slug), count)
+        for collection_id, name, slug, count in counted
+    ]
+    # The counted collections are the full collection list, so it is not queried a second time
+    collections = sorted(
+        (collection for collection, _ in collection_summaries),
+        key=lambda collection: collection.name.lower(),
+    )
+    return LinksSidebar(
+        tags=list_tags(session),
+        collections=collections,
+        collection_summaries=collection_summaries,
+        has_broken_links=has_broken_links(session),
     )
-    return [(collection, count) for collection, count in collection_counts]
 
 
 # Tag management functions
@@ -534,7 +834,7 @@ def create_tag(session: Session, name: str) -> Tag:
 
     # Check if tag already exists
     existing = session.execute(
-        select(Tag).where(func.lower(Tag.name) == func.lower(normalized))
+        select(Tag).where(Tag.name_lower == normalized.lower())
     ).scalar_one_or_none()
     if existing:
         raise ValueError(f"Tag '{normalized}' already exists")
@@ -542,6 +842,7 @@ def create_tag(session: Session, name: str) -> Tag:
     tag = Tag(name=normalized, slug="")
     session.add(tag)
     session.flush()
+    invalidate_tag_caches()
     return tag
 
 
@@ -552,7 +853,7 @@ def update_tag(session: Session, tag: Tag, new_name: str, icon: str | None = Non
 
     # Check if another tag with the same name exists
     existing = session.execute(
-        select(Tag).where(func.lower(Tag.name) == func.lower(normalized), Tag.id != tag.id)
+        select(Tag).where(Tag.name_lower == normalized.lower(), Tag.id != tag.id)
     ).scalar_one_or_none()
     if existing:
         raise ValueError(f"Tag '{normalized}' already exists")
@@ -563,26 +864,24 @@ def update_tag(session: Session, tag: Tag, new_name: str, icon: str | None = Non
     if color is not None:
         tag.color = color if color.strip() else None
     session.flush()
+    invalidate_tag_caches()
     return tag
 
 
 def delete_tag(session: Session, tag: Tag) -> None:
     session.delete(tag)
     session.flush()
+    invalidate_tag_caches()
 
 
 def list_tags_with_counts(session: Session) -> Sequence[tuple[Tag, int]]:
     """Return a list of all tags with their link counts."""
-    tag_counts = (
-        session.execute(
-            select(Tag, func.count(link_tag_table.c.link_id).label("count"))
-            .outerjoin(link_tag_table, Tag.id == link_tag_table.c.tag_id)
-            .group_by(Tag.id)
-            .order_by(Tag.name)
-        )
-        .all()
-    )
-    return [(tag, count) for tag, count in tag_counts]
+    return session.execute(
+        select(Tag, func.count(link_tag_table.c.link_id).label("count"))
+        .outerjoin(link_tag_table, Tag.id == link_tag_table.c.tag_id)
+        .group_by(Tag.id)
+        .order_by(Tag.name)
+    ).all()
 
 
 # Collection management functions
@@ -597,7 +896,7 @@ def create_collection(session: Session, name: str) -> Collection:
 
     # Check if collection already exists
     existing = session.execute(
-        select(Collection).where(func.lower(Collection.name) == func.lower(normalized))
+        select(Collection).where(Collection.name_lower == normalized.lower())
     ).scalar_one_or_none()
     if existing:
         raise ValueError(f"Collection '{normalized}' already exists")
@@ -615,7 +914,9 @@ def update_collection(session: Session, collection: Collection, new_name: str) -
 
     # Check if another collection with the same name exists
     existing = session.execute(
-        select(Collection).where(func.lower(Collection.name) == func.lower(normalized), Collection.id != collection.id)
+        select(Collection).where(
+            Collection.name_lower == normalized.lower(), Collection.id != collection.id
+        )
     ).scalar_one_or_none()
     if existing:
         raise ValueError(f"Collection '{normalized}' already exists")
@@ -626,20 +927,46 @@ def update_collection(session: Session, collection: Collection, new_name: str) -
 
 
 def delete_collection(session: Session, collection: Collection) -> None:
-    # First, set collection_id to NULL for all links using this collection
-    session.execute(
-        select(Link)
-        .where(Link.collection_id == collection.id)
-    )
-    for link in session.execute(select(Link).where(Link.collection_id == collection.id)).scalars():
-        link.collection_id = None
-    session.flush()
-    
-    # Now delete the collection
+    # Detach links and notes in bulk rather than letting the ORM update them row by row
+    for model in (Link, Note):
+        session.execute(
+            update(model).where(model.collection_id == collection.id).values(collection_id=None)
+        )
+    session.expire(collection, ["links", "notes"])
+
     session.delete(collection)
     session.flush()
 
 
+# Note image functions
+NOTE_IMAGE_URL_PREFIX = "/images/"
+
+
+def create_note_image(session: Session, data: bytes, content_type: str) -> NoteImage:
+    image = NoteImage(data=data, content_type=content_type)
+    session.add(image)
+    session.flush()
+    return image
+
+
+def get_note_image(session: Session, image_id: int) -> NoteImage | None:
+    return session.get(NoteImage, image_id)
+
+
+def note_image_url(image: NoteImage) -> str:
+    """Return the path notes store in image_url to reference an uploaded image."""
+    return f"{NOTE_IMAGE_URL_PREFIX}{image.id}"
+
+
+def _delete_note_image_by_url(session: Session, image_url: str | None) -> None:
+    # Legacy data URLs and external URLs have no stored image to clean up
+    if not image_url or not image_url.startswith(NOTE_IMAGE_URL_PREFIX):
+        return
+    image_id = image_url.removeprefix(NOTE_IMAGE_URL_PREFIX)
+    if image_id.isdigit():
+        session.execute(delete(NoteImage).where(NoteImage.id == int(image_id)))
+
+
 # Note CRUD functions
 def create_note(session: Session, note_data: NoteCreate) -> Note:
     """Create a new note with tags and collection"""
@@ -652,31 +979,15 @@ def create_note(session: Session, note_data: NoteCreate) -> Note:
 
     # Handle collection
     if note_data.collection:
-        collection_name = note_data.collection.strip()
-        if collection_name:
-            collection = session.execute(
-                select(Collection).where(func.lower(Collection.name) == func.lower(collection_name))
-            ).scalar_one_or_none()
-            if not collection:
-                collection = Collection(name=collection_name, slug="")
-                session.add(collection)
-                session.flush()
+        collection = get_or_create_collection(session, note_data.collection)
+        if collection:
             note.collection = collection
 
     # Handle tags
     if note_data.tags:
-        for tag_name in note_data.tags:
-            normalized = _normalize_tag(tag_name)
-            if not normalized:
-                continue
-            tag = session.execute(
-                select(Tag).where(func.lower(Tag.name) == func.lower(normalized))
-            ).scalar_one_or_none()
-            if not tag:
-                tag = Tag(name=normalized, slug="", icon=None, color=None)
-                session.add(tag)
-                session.flush()
-            note.tags.append(tag)
+        note.tags = _get_or_create_tags_by_name(
+            session, [name for name in map(_normalize_tag, note_data.tags) if name]
+        )
 
     session.add(note)
     session.flush()
@@ -685,7 +996,11 @@ def create_note(session: Session, note_data: NoteCreate) -> Note:
 
 def get_note(session: Session, note_id: int) -> Note | None:
     """Get a single note by ID"""
-    return session.execute(select(Note).where(Note.id == note_id)).scalar_one_or_none()
+    return session.get(
+        Note,
+        note_id,
+        options=[joinedload(Note.collection), selectinload(Note.tags)],
+    )
 
 
 def list_notes(
@@ -695,16 +1010,24 @@ def list_notes(
     tags: list[str] | None = None,
     collection: str | None = None,
     collections: list[str] | None = None,
-    date_from: str | None = None,
-    date_to: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
     page: int = 1,
     page_size: int = DEFAULT_PAGE_SIZE,
-) -> tuple[Sequence[Note], int]:
-    """List notes with filtering and pagination"""
-    query = select(Note).options(joinedload(Note.tags), joinedload(Note.collection))
+    after: tuple[datetime, int] | None = None,
+    with_total: bool = True,
+) -> tuple[Sequence[Note], int | None]:
+    """List notes with filtering, paged by ``page`` or the keyset cursor ``after``
+
+    The total is None when ``with_total`` is False, which skips its COUNT query.
+    """
+    query = select(Note).options(selectinload(Note.tags), joinedload(Note.collection))
 
     # Search filter
-    if search:
+    search_term = search.strip() if search else ""
+    if len(search_term) >= FTS_MIN_TERM_LENGTH and _fts_available(session, "notes_fts"):
+        query = query.where(Note.id.in_(_fts_phrase_ids("notes_fts", search_term)))
+    elif search:
         query = query.where(
             (Note.title.ilike(f"%{search}%")) | (Note.content.ilike(f"%{search}%"))
         )
@@ -712,9 +1035,14 @@ def list_notes(
     # Tag filters
     if tag:
         query = query.join(Note.tags).where(Tag.slug == tag)
-    if tags:
-        for tag_slug in tags:
-            query = query.join(Note.tags).where(Tag.slug == tag_slug)
+    elif tags:
+        # Join the tags once and require every selected tag to be present (AND logic)
+        query = (
+            query.join(Note.tags)
+            .where(Tag.slug.in_(tags))
+            .group_by(Note.id)
+            .having(func.count(func.distinct(Tag.id)) >= len(set(tags)))
+        )
 
     # Collection filters
     if collection:
@@ -722,30 +1050,24 @@ def list_notes(
     if collections:
         query = query.join(Note.collection).where(Collection.slug.in_(collections))
 
-    # Date range filters
-    if date_from:
-        try:
-            from_date = datetime.fromisoformat(date_from)
-            query = query.where(Note.created_at >= from_date)
-        except ValueError:
-            pass
-    if date_to:
-        try:
-            to_date = datetime.fromisoformat(date_to)
-            query = query.where(Note.created_at <= to_date)
-        except ValueError:
-            pass
+    query = query.where(*_created_between(Note, date_from, date_to))
 
-    # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total = session.execute(count_query).scalar() or 0
+    total = None
+    if with_total:
+        # Count total over note ids only, so the eager-loaded tag/collection joins are left out
+        count_query = select(func.count()).select_from(query.with_only_columns(Note.id).subquery())
+        total = session.execute(count_query).scalar() or 0
 
     # Apply pagination
-    query = query.order_by(Note.created_at.desc())
+    query = query.order_by(Note.created_at.desc(), Note.id.desc())
+    if after is not None:
+        query = query.where(_created_before(session, Note, after))
     if page_size > 0:
-        query = query.limit(page_size).offset((page - 1) * page_size)
+        query = query.limit(page_size)
+        if after is None:
+            query = query.offset((page - 1) * page_size)
 
-    notes = session.execute(query).scalars().unique().all()
+    notes = session.execute(query).scalars().all()
     return notes, total
 
 
@@ -757,38 +1079,19 @@ def update_note(session: Session, note: Note, note_data: NoteUpdate) -> Note:
     if note_data.content is not None:
         note.content = note_data.content
     if note_data.image_url is not None:
+        if note_data.image_url != note.image_url:
+            _delete_note_image_by_url(session, note.image_url)
         note.image_url = note_data.image_url
 
     # Update collection
     if note_data.collection is not None:
-        if note_data.collection.strip():
-            collection_name = note_data.collection.strip()
-            collection = session.execute(
-                select(Collection).where(func.lower(Collection.name) == func.lower(collection_name))
-            ).scalar_one_or_none()
-            if not collection:
-                collection = Collection(name=collection_name, slug="")
-                session.add(collection)
-                session.flush()
-            note.collection = collection
-        else:
-            note.collection = None
+        note.collection = get_or_create_collection(session, note_data.collection)
 
     # Update tags
     if note_data.tags is not None:
-        note.tags.clear()
-        for tag_name in note_data.tags:
-            normalized = _normalize_tag(tag_name)
-            if not normalized:
-                continue
-            tag = session.execute(
-                select(Tag).where(func.lower(Tag.name) == func.lower(normalized))
-            ).scalar_one_or_none()
-            if not tag:
-                tag = Tag(name=normalized, slug="", icon=None, color=None)
-                session.add(tag)
-                session.flush()
-            note.tags.append(tag)
+        note.tags = _get_or_create_tags_by_name(
+            session, [name for name in map(_normalize_tag, note_data.tags) if name]
+        )
 
     session.flush()
     return note
@@ -796,6 +1099,18 @@ def update_note(session: Session, note: Note, note_data: NoteUpdate) -> Note:
 
 def delete_note(session: Session, note: Note) -> None:
     """Delete a note"""
+    _delete_note_image_by_url(session, note.image_url)
     session.delete(note)
     session.flush()
 
+
+def delete_note_by_id(session: Session, note_id: int) -> bool:
+    """Delete a note and its stored image without loading it; False if it did not exist."""
+    deleted = session.execute(
+        delete(Note).where(Note.id == note_id).returning(Note.image_url)
+    ).first()
+    if deleted is None:
+        return False
+    _delete_note_image_by_url(session, deleted.image_url)
+    return True
+
@@ -1,19 +1,80 @@
+import sqlite3
 from collections.abc import Iterator
 from contextlib import contextmanager
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from .config import get_settings
 
 settings = get_settings()
 
+_is_sqlite = settings.database_url.startswith("sqlite")
+_url = make_url(settings.database_url)
+_pool_options: dict[str, object] = {}
+# In-memory SQLite uses a per-thread pool that rejects queue sizing, so only size a QueuePool
+if issubclass(_url.get_dialect().get_pool_class(_url), QueuePool):
+    # Enough connections for every worker thread plus async handlers on the event loop, so a
+    # sync route never waits on checkout; the defaults (5 + 10 overflow) queue requests long before
+    _max_overflow = settings.db_max_overflow
+    if _max_overflow is None:
+        _max_overflow = max(settings.threadpool_size + 1 - settings.db_pool_size, 0)
+    _pool_options.update(pool_size=settings.db_pool_size, max_overflow=_max_overflow)
+if not _is_sqlite:
+    # Server databases drop idle connections; SQLite files never do
+    _pool_options.update(pool_pre_ping=True, pool_recycle=3600)
+
 engine = create_engine(
     settings.database_url,
-    connect_args={"check_same_thread": False} if settings.database_url.startswith("sqlite") else {},
+    connect_args={"check_same_thread": False} if _is_sqlite else {},
     future=True,
+    **_pool_options,
+)
+
+
+SQLITE_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    # SQLite leaves foreign keys unenforced unless every connection opts in
+    "PRAGMA foreign_keys=ON",
 )
 
+
+def apply_sqlite_pragmas(dbapi_connection) -> None:
+    """Switch a raw SQLite connection to WAL and apply the throughput pragmas."""
+    cursor = dbapi_connection.cursor()
+    try:
+        journal_mode = cursor.execute("PRAGMA journal_mode").fetchone()[0]
+        if journal_mode.lower() != "wal":
+            cursor.execute("PRAGMA journal_mode=WAL")
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+if _is_sqlite:
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        apply_sqlite_pragmas(dbapi_connection)
+
+    @event.listens_for(engine, "close")
+    def _optimize_on_close(dbapi_connection, connection_record) -> None:
+        """Let SQLite refresh planner statistics before a pooled connection closes."""
+        try:
+            if sqlite3.sqlite_version_info < (3, 46, 0):
+                # Newer SQLite applies this limit by default; keep optimize cheap on older builds
+                dbapi_connection.execute("PRAGMA analysis_limit=400")
+            dbapi_connection.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
+
+
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
 
 Base = declarative_base()
@@ -1,26 +1,52 @@
 """Image processing utilities for note images."""
 
-import base64
 import io
 
+import anyio.to_thread
 from PIL import Image
 
+JPEG_CONTENT_TYPE = "image/jpeg"
+MAX_QUALITY = 95
+PROBE_QUALITY = 50
+MIN_QUALITY = 30
+# Large JPEG sources are decoded at a reduced scale close to this size
+DRAFT_MAX_DIMENSION = 1600
 
-def compress_image(image_data: bytes, max_size_kb: int = 100) -> str:
+
+def _save_jpeg(img: Image.Image, quality: int, final: bool = False) -> io.BytesIO:
+    # Probe encodes skip the Huffman optimization pass; only the kept encode pays for it
+    output = io.BytesIO()
+    img.save(
+        output,
+        format="JPEG",
+        quality=quality,
+        optimize=final,
+        progressive=final,
+        subsampling=2,
+    )
+    return output
+
+
+def compress_image(image_data: bytes, max_size_kb: int = 100) -> tuple[bytes, str]:
     """
     Compress image to be under max_size_kb while maintaining quality.
-    Returns base64 encoded data URL.
+    Returns the encoded bytes and their content type.
     
     Args:
         image_data: Raw image bytes
         max_size_kb: Maximum size in kilobytes (default 100KB)
     
     Returns:
-        Base64 data URL string (e.g., "data:image/jpeg;base64,...")
+        Tuple of JPEG bytes and "image/jpeg"
     """
     try:
         # Open image
         img = Image.open(io.BytesIO(image_data))
+
+        # Let libjpeg downscale during decode rather than decoding pixels we would throw away
+        if img.format == "JPEG" and max(img.size) > DRAFT_MAX_DIMENSION:
+            scale = DRAFT_MAX_DIMENSION / max(img.size)
+            img.draft("RGB", (int(img.width * scale), int(img.height * scale)))
         
         # Convert RGBA to RGB if necessary
         if img.mode in ('RGBA', 'LA', 'P'):
@@ -30,49 +56,80 @@ def compress_image(image_data: bytes, max_size_kb: int = 100) -> str:
             background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
             img = background
         
-        # Start with high quality
-        quality = 95
-        output_format = 'JPEG'
-        
-        while quality > 20:
-            output = io.BytesIO()
-            img.save(output, format=output_format, quality=quality, optimize=True)
-            size_kb = len(output.getvalue()) / 1024
-            
-            if size_kb <= max_size_kb:
-                break
-            
-            # Reduce quality for next iteration
-            quality -= 5
-        
+        # JPEG size grows roughly linearly with quality over this range, so two probe
+        # encodes are enough to predict the quality that fits instead of stepping down
+        max_bytes = max_size_kb * 1024
+        quality = MAX_QUALITY
+        high_size = len(_save_jpeg(img, MAX_QUALITY).getvalue())
+        size = high_size
+        if high_size > max_bytes:
+            quality = PROBE_QUALITY
+            size = low_size = len(_save_jpeg(img, PROBE_QUALITY).getvalue())
+            if low_size <= max_bytes:
+                estimate = PROBE_QUALITY + int(
+                    (max_bytes - low_size) / (high_size - low_size) * (MAX_QUALITY - PROBE_QUALITY)
+                )
+                if estimate > PROBE_QUALITY:
+                    estimate_size = len(_save_jpeg(img, estimate).getvalue())
+                    # Keep the probe when the estimate overshoots; it is known to fit
+                    if estimate_size <= max_bytes:
+                        quality, size = estimate, estimate_size
+            else:
+                quality = MIN_QUALITY
+                size = len(_save_jpeg(img, MIN_QUALITY).getvalue())
+        size_kb = size / 1024
+
         # If still too large, resize the image
         if size_kb > max_size_kb:
             scale_factor = (max_size_kb / size_kb) ** 0.5
             new_size = (int(img.width * scale_factor), int(img.height * scale_factor))
             img = img.resize(new_size, Image.Resampling.LANCZOS)
-            
-            output = io.BytesIO()
-            img.save(output, format=output_format, quality=85, optimize=True)
-        
-        # Encode as base64 data URL
-        output.seek(0)
-        img_base64 = base64.b64encode(output.read()).decode('utf-8')
-        return f"data:image/jpeg;base64,{img_base64}"
+            quality = 85
+
+        # Optimized progressive output comes out smaller than the baseline probes measured above
+        output = _save_jpeg(img, quality, final=True)
+        return output.getvalue(), JPEG_CONTENT_TYPE
     
     except Exception as e:
         raise ValueError(f"Failed to process image: {str(e)}") from e
 
 
-def validate_image(image_data: bytes) -> bool:
+async def compress_image_async(image_data: bytes, max_size_kb: int = 100) -> tuple[bytes, str]:
+    """
+    Run compress_image in a worker thread so encoding does not block the event loop.
+
+    Pillow releases the GIL while decoding and encoding, so concurrent uploads
+    also compress in parallel.
+    """
+    return await anyio.to_thread.run_sync(compress_image, image_data, max_size_kb)
+
+
+def _has_known_image_signature(image_data: bytes) -> bool:
+    return (
+        image_data[:3] == b"\xff\xd8\xff"
+        or image_data[:8] == b"\x89PNG\r\n\x1a\n"
+        or image_data[:6] in (b"GIF87a", b"GIF89a")
+        or (image_data[:4] == b"RIFF" and image_data[8:12] == b"WEBP")
+    )
+
+
+def validate_image(image_data: bytes, deep: bool = False) -> bool:
     """
     Validate that the data is a valid image.
+
+    JPEG, PNG, GIF and WebP uploads are accepted from their file signature alone,
+    since compress_image decodes them fully anyway. Other data, or any data when
+    deep is set, is checked with Pillow's verify().
     
     Args:
         image_data: Raw image bytes
+        deep: Always run the full verify() pass
     
     Returns:
         True if valid image, False otherwise
     """
+    if not deep and _has_known_image_signature(image_data):
+        return True
     try:
         img = Image.open(io.BytesIO(image_data))
         img.verify()
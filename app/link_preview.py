@@ -2,92 +2,319 @@
 
 from __future__ import annotations
 
+import asyncio
 import re
-from urllib.parse import urljoin, urlparse
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from urllib.parse import urljoin, urlparse, urlunparse
 
 import httpx
-from bs4 import BeautifulSoup
+from lxml import etree
 
+from .config import get_settings
 
-def _extract_instagram_caption(soup: BeautifulSoup) -> str | None:
+# lxml parsers keep per-document state, so each thread reuses its own instances
+_parsers = threading.local()
+
+# Pages without a charset header declare it in a <meta> tag near the top
+_META_CHARSET_RE = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?([A-Za-z0-9._:-]+)""", re.IGNORECASE
+)
+_CHARSET_SNIFF_BYTES = 2048
+# Elements the streaming parser reports; the end of <head> stops the read
+_PULL_TAGS = ("head", "title", "meta")
+
+_INSTAGRAM_CAPTION_CLASSES = ("_ap3a", "_aaco", "_aacu", "_aacx", "_aad7", "_aade")
+# Caption containers carry every one of these classes, in any order
+_INSTAGRAM_CAPTION_XPATH = etree.XPath(
+    "//*["
+    + " and ".join(
+        f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+        for name in _INSTAGRAM_CAPTION_CLASSES
+    )
+    + "]"
+)
+# Instagram captions quote the post text after the author's name
+_QUOTED_TEXT_RE = re.compile(r'"([^"]+)"')
+
+_PREVIEW_META_KEYS = frozenset({"og:title", "og:description", "og:image", "description"})
+
+# Streaming previews stop reading once <head> closes or this many bytes have arrived
+_HEAD_READ_LIMIT = 512 * 1024
+
+_CLIENT_OPTIONS = {
+    "headers": {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"},
+    "limits": httpx.Limits(max_keepalive_connections=32),
+}
+
+# Pooled client shared by previews on the app's event loop, opened and closed by its lifespan
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+# Successful previews keyed by normalized URL, stored with the time they expire and the
+# conditional request headers that revalidate them once they do
+_preview_cache: OrderedDict[
+    str, tuple[float, dict[str, str | int | bool | None], dict[str, str]]
+] = OrderedDict()
+
+# Response validators and the request headers that send them back
+_VALIDATOR_HEADERS = (("etag", "If-None-Match"), ("last-modified", "If-Modified-Since"))
+
+# Every element the preview reads, compiled once and evaluated in a single pass
+_HEAD_FIELDS_XPATH = etree.XPath(
+    "//meta[@property='og:title' or @property='og:description' or @property='og:image'"
+    " or @name='description'] | //title"
+)
+
+
+async def open_http_client() -> None:
+    """Create the pooled preview client on the running event loop."""
+    global _client, _client_loop
+    if _client is None:
+        _client = httpx.AsyncClient(**_CLIENT_OPTIONS)
+        _client_loop = asyncio.get_running_loop()
+
+
+async def close_http_client() -> None:
+    """Close the pooled preview client and its keep-alive connections."""
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        _client_loop = None
+
+
+@asynccontextmanager
+async def _http_client() -> AsyncIterator[httpx.AsyncClient]:
+    # Connections are bound to the loop that opened them, so callers on another loop
+    # (such as background tasks using asyncio.run) get a short-lived client instead
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        yield _client
+    else:
+        async with httpx.AsyncClient(**_CLIENT_OPTIONS) as client:
+            yield client
+
+
+def _collect_head_field(fields: dict[str, str], key: str | None, value: str | None) -> None:
+    # The first non-empty value for each field wins, matching document order
+    value = (value or "").strip()
+    if key and value:
+        fields.setdefault(key, value)
+
+
+def _collect_head_element(fields: dict[str, str], element: etree._Element) -> None:
+    if element.tag == "title":
+        _collect_head_field(fields, "title", "".join(element.itertext()))
+        return
+    key = element.get("property") or element.get("name")
+    if key in _PREVIEW_META_KEYS:
+        _collect_head_field(fields, key, element.get("content"))
+
+
+def _head_fields_from_tree(root: etree._Element) -> dict[str, str]:
+    """Return title and preview meta values keyed by tag name, property, or name."""
+    fields: dict[str, str] = {}
+    for element in _HEAD_FIELDS_XPATH(root):
+        _collect_head_element(fields, element)
+    return fields
+
+
+def _page_encoding(declared: str | None, data: bytes) -> str:
+    """Pick the page encoding like a browser: header charset, then <meta> charset, then UTF-8."""
+    if declared:
+        return declared
+    match = _META_CHARSET_RE.search(data, 0, _CHARSET_SNIFF_BYTES)
+    return match.group(1).decode("ascii") if match else "utf-8"
+
+
+def _parse_html(data: bytes, declared_encoding: str | None = None) -> etree._Element | None:
+    """Parse raw page bytes with this thread's reusable parser for the page encoding."""
+    encoding = _page_encoding(declared_encoding, data)
+    parsers = getattr(_parsers, "by_encoding", None)
+    if parsers is None:
+        parsers = _parsers.by_encoding = {}
+    parser = parsers.get(encoding)
+    if parser is None:
+        try:
+            parser = etree.HTMLParser(
+                encoding=encoding,
+                recover=True,
+                huge_tree=False,
+                remove_comments=True,
+                remove_pis=True,
+            )
+        except LookupError:
+            # libxml2 does not know every charset alias
+            return _parse_html(data, "utf-8") if encoding != "utf-8" else None
+        parsers[encoding] = parser
+    return etree.fromstring(data, parser)
+
+
+def _extract_head_fields(data: bytes) -> dict[str, str]:
+    root = _parse_html(data)
+    return _head_fields_from_tree(root) if root is not None else {}
+
+
+def _pull_parser(encoding: str) -> etree.HTMLPullParser:
+    try:
+        return etree.HTMLPullParser(events=("end",), tag=_PULL_TAGS, encoding=encoding)
+    except LookupError:
+        # libxml2 does not know every charset alias
+        return etree.HTMLPullParser(events=("end",), tag=_PULL_TAGS, encoding="utf-8")
+
+
+async def _stream_head_fields(response: httpx.Response) -> dict[str, str]:
+    """Feed the body to an incremental parser and stop once </head> has been seen."""
+    parser = None
+    fields: dict[str, str] = {}
+    received = 0
+    async for chunk in response.aiter_bytes():
+        if parser is None:
+            parser = _pull_parser(_page_encoding(response.charset_encoding, chunk))
+        parser.feed(chunk)
+        received += len(chunk)
+        for _, element in parser.read_events():
+            if element.tag == "head":
+                return fields
+            _collect_head_element(fields, element)
+        if received >= _HEAD_READ_LIMIT:
+            break
+    if parser is None:
+        return fields
+    # Pages without a closing head still flush their last elements on close
+    try:
+        parser.close()
+    except etree.XMLSyntaxError:
+        pass
+    for _, element in parser.read_events():
+        if element.tag != "head":
+            _collect_head_element(fields, element)
+    return fields
+
+
+def _extract_instagram_caption(root: etree._Element) -> str | None:
     # Instagram renders post text in caption containers; class list may change over time.
-    caption_nodes = soup.find_all(class_="_ap3a _aaco _aacu _aacx _aad7 _aade")
-    if not caption_nodes:
-        return None
-    parts = [node.get_text(" ", strip=True) for node in caption_nodes if node.get_text(strip=True)]
-    caption = " ".join([p for p in parts if p]).strip()
+    parts = []
+    for node in _INSTAGRAM_CAPTION_XPATH(root):
+        text = " ".join(piece.strip() for piece in node.itertext() if piece.strip())
+        if text:
+            parts.append(text)
+    caption = " ".join(parts).strip()
     if not caption:
         return None
-    match = re.search(r'"([^"]+)"', caption)
+    match = _QUOTED_TEXT_RE.search(caption)
     if match:
         return match.group(1).strip() or None
     return None
 
 
+def _preview_cache_key(url: str) -> str:
+    # Scheme and host are case-insensitive and fragments never reach the server
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return url
+    return urlunparse(
+        parsed._replace(scheme=parsed.scheme.lower(), netloc=parsed.netloc.lower(), fragment="")
+    )
+
+
+def clear_preview_cache() -> None:
+    """Forget every cached link preview."""
+    _preview_cache.clear()
+
+
 async def fetch_link_metadata(url: str, timeout: int = 10) -> dict[str, str | int | bool | None]:
-    """Fetch metadata from a URL including title, description, image, and status."""
+    """Fetch metadata from a URL, serving recent successful previews from memory."""
+    settings = get_settings()
+    key = _preview_cache_key(url)
+    now = time.monotonic()
+    cached = _preview_cache.get(key)
+    validators: dict[str, str] = {}
+    if cached is not None:
+        expires_at, metadata, validators = cached
+        if expires_at > now:
+            _preview_cache.move_to_end(key)
+            return dict(metadata)
+
+    fetched, fresh_validators = await _fetch_link_metadata_uncached(url, timeout, validators)
+    if fetched is None:
+        # 304 Not Modified: the expired preview still describes the page
+        metadata = dict(cached[1])
+        fresh_validators = fresh_validators or validators
+    else:
+        metadata = fetched
+    # Only successful fetches are cached so timeouts and server errors are retried
+    if metadata["is_accessible"] and settings.preview_cache_size > 0:
+        _preview_cache[key] = (now + settings.preview_cache_ttl, dict(metadata), fresh_validators)
+        _preview_cache.move_to_end(key)
+        while len(_preview_cache) > settings.preview_cache_size:
+            _preview_cache.popitem(last=False)
+    else:
+        _preview_cache.pop(key, None)
+    return metadata
+
+
+async def _fetch_link_metadata_uncached(
+    url: str, timeout: int, validators: dict[str, str] | None = None
+) -> tuple[dict[str, str | int | bool | None] | None, dict[str, str]]:
+    """Fetch metadata from a URL including title, description, image, and status.
+
+    Returns the metadata with the validators for revalidating it later. The metadata is None
+    when ``validators`` were sent and the server answered 304 Not Modified.
+    """
     status_code = None
     is_accessible = False
 
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url, headers=headers, timeout=timeout, follow_redirects=True
-            )
+        try:
+            host = urlparse(url).netloc.lower()
+        except Exception:
+            host = ""
+        is_instagram = "instagram.com" in host
+
+        async with _http_client() as client, client.stream(
+            "GET", url, headers=validators or None, timeout=timeout, follow_redirects=True
+        ) as response:
             status_code = response.status_code
+            response_validators = {
+                request_header: response.headers[header]
+                for header, request_header in _VALIDATOR_HEADERS
+                if header in response.headers
+            }
+            if validators and status_code == httpx.codes.NOT_MODIFIED:
+                return None, response_validators
             response.raise_for_status()
             is_accessible = True
 
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            # Try to get title from various sources
-            title = None
-            og_title = soup.find("meta", property="og:title")
-            if og_title:
-                content = og_title.get("content")
-                if content:
-                    title = str(content).strip()
-            if not title and soup.title and soup.title.string:
-                title = soup.title.string.strip()
-
-            # Try to get description
-            description = None
-            og_desc = soup.find("meta", property="og:description")
-            if og_desc:
-                content = og_desc.get("content")
-                if content:
-                    description = str(content).strip()
-            if not description:
-                meta_desc = soup.find("meta", attrs={"name": "description"})
-                if meta_desc:
-                    content = meta_desc.get("content")
-                    if content:
-                        description = str(content).strip()
+            caption = None
+            if is_instagram:
+                # Captions live in the page body, so these pages are read and parsed in full
+                root = _parse_html(await response.aread(), response.charset_encoding)
+                if root is not None:
+                    # Head fields and the caption come from the same parsed tree
+                    fields = _head_fields_from_tree(root)
+                    caption = _extract_instagram_caption(root)
+                else:
+                    fields = {}
+            else:
+                fields = await _stream_head_fields(response)
+
+            title = fields.get("og:title") or fields.get("title")
+            description = fields.get("og:description") or fields.get("description")
 
             # Instagram-specific caption scraping (class may change over time)
-            try:
-                host = urlparse(url).netloc.lower()
-            except Exception:
-                host = ""
-            if "instagram.com" in host:
-                caption = _extract_instagram_caption(soup)
-                if caption:
-                    description = caption
-                    print(f"Extracted Instagram caption: {caption}")
-
-            # Try to get image
-            image = None
-            og_image = soup.find("meta", property="og:image")
-            if og_image:
-                content = og_image.get("content")
-                if content:
-                    image = str(content).strip()
-                    # Make absolute URL if relative
-                    if image and not image.startswith(("http://", "https://")):
-                        image = urljoin(url, image)
+            if caption:
+                description = caption
+                print(f"Extracted Instagram caption: {caption}")
+
+            image = fields.get("og:image")
+            # Make absolute URL if relative
+            if image and not image.startswith(("http://", "https://")):
+                image = urljoin(url, image)
 
             return {
                 "title": title,
@@ -96,7 +323,7 @@ async def fetch_link_metadata(url: str, timeout: int = 10) -> dict[str, str | in
                 "error": None,
                 "status_code": status_code,
                 "is_accessible": is_accessible,
-            }
+            }, response_validators
     except httpx.HTTPStatusError as e:
         return {
             "title": None,
@@ -105,7 +332,7 @@ async def fetch_link_metadata(url: str, timeout: int = 10) -> dict[str, str | in
             "error": f"HTTP {e.response.status_code}: {str(e)}",
             "status_code": e.response.status_code,
             "is_accessible": False,
-        }
+        }, {}
     except httpx.HTTPError as e:
         return {
             "title": None,
@@ -114,7 +341,7 @@ async def fetch_link_metadata(url: str, timeout: int = 10) -> dict[str, str | in
             "error": f"Failed to fetch: {str(e)}",
             "status_code": None,
             "is_accessible": False,
-        }
+        }, {}
     except Exception as e:
         return {
             "title": None,
@@ -123,4 +350,4 @@ async def fetch_link_metadata(url: str, timeout: int = 10) -> dict[str, str | in
             "error": f"Error: {str(e)}",
             "status_code": None,
             "is_accessible": False,
-        }
+        }, {}
@@ -3,13 +3,19 @@ from __future__ import annotations
 from contextlib import asynccontextmanager
 from pathlib import Path
 
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from starlette.staticfiles import StaticFiles
 
+from .config import get_settings
 from .crud import ensure_default_tags
 from .database import Base, SessionLocal, engine
+from .link_preview import close_http_client, open_http_client
+from .migrations import run_migrations
 from .routers import api, web
+from .tasks import start_refresh_worker, stop_refresh_worker
 
 STATIC_DIR = Path(__file__).resolve().parent / "static"
 
@@ -17,11 +23,21 @@ STATIC_DIR = Path(__file__).resolve().parent / "static"
 def create_app() -> FastAPI:
     @asynccontextmanager
     async def lifespan(app: FastAPI):  # pragma: no cover - simple bootstrap hook
+        # Sync routes run in anyio's worker threads, which default to 40 and cap concurrency
+        to_thread.current_default_thread_limiter().total_tokens = get_settings().threadpool_size
         Base.metadata.create_all(bind=engine)
+        # create_all only adds missing tables; existing ones get their new columns here
+        run_migrations()
         with SessionLocal() as session:
             ensure_default_tags(session)
             session.commit()
-        yield
+        await open_http_client()
+        await start_refresh_worker()
+        try:
+            yield
+        finally:
+            await stop_refresh_worker()
+            await close_http_client()
 
     app = FastAPI(title="NoteKeep", lifespan=lifespan)
 
@@ -32,6 +48,8 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
         allow_credentials=True,
     )
+    # Link exports and list pages are repetitive JSON and HTML that compress well
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
 
     app.include_router(api.router)
     app.include_router(web.router)
@@ -0,0 +1,37 @@
+"""Versioned SQLite migrations that bring databases from earlier releases up to date."""
+
+from .add_fts_migration import add_links_fts
+from .add_list_indexes import add_list_indexes
+from .add_name_lower_columns import add_name_lower_columns
+from .add_normalized_url_column import add_normalized_url_column
+from .add_note_image_column import add_image_column
+from .add_note_images_autoincrement import add_note_images_autoincrement
+from .add_note_images_table import add_note_images_table
+from .add_notes_fts_migration import add_notes_fts
+from .add_search_columns import add_search_columns
+from .refresh_normalized_urls import refresh_normalized_urls
+from .utils import database_path
+
+# Applied in VERSION order; each one skips itself once it is recorded in schema_migrations
+MIGRATIONS = (
+    add_image_column,
+    add_normalized_url_column,
+    add_list_indexes,
+    add_search_columns,
+    add_links_fts,
+    add_name_lower_columns,
+    add_note_images_table,
+    add_notes_fts,
+    add_note_images_autoincrement,
+    refresh_normalized_urls,
+)
+
+
+def run_migrations(db_path: str | None = None) -> None:
+    """Bring an existing SQLite database up to the schema the models expect."""
+    db_path = db_path or database_path()
+    if db_path is None:
+        # Other databases are created fresh by create_all and have no history to replay
+        return
+    for migration in MIGRATIONS:
+        migration(db_path)
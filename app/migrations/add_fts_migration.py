@@ -0,0 +1,54 @@
+"""Add trigram full-text search index over links."""
+
+import sqlite3
+import sys
+
+from ..models import LINKS_FTS_DDL
+from .utils import already_applied, connect, mark_applied
+
+VERSION = 5
+
+
+def add_links_fts(db_path=None):
+    """Create links_fts with its sync triggers and index existing links."""
+    conn = None
+
+    try:
+        conn = connect(db_path)
+        cursor = conn.cursor()
+
+        if already_applied(cursor, VERSION):
+            print("✓ Migration for full-text index already applied")
+            return
+
+        # Databases created by the app already get links_fts from create_all
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'links_fts'")
+        if cursor.fetchone() is not None:
+            mark_applied(cursor, VERSION)
+            print("✓ Full-text index 'links_fts' already exists")
+            return
+
+        # Apply every change in a single write transaction
+        cursor.execute("BEGIN IMMEDIATE")
+        for statement in LINKS_FTS_DDL:
+            cursor.execute(statement)
+
+        # Index the links that existed before the triggers were installed
+        cursor.execute("INSERT INTO links_fts(links_fts) VALUES ('rebuild')")
+
+        mark_applied(cursor, VERSION)
+        cursor.execute("COMMIT")
+        cursor.execute("PRAGMA optimize")
+        print("✓ Successfully created full-text index 'links_fts'")
+
+    except sqlite3.Error as e:
+        if conn and conn.in_transaction:
+            conn.rollback()
+        print(f"✗ Database error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if conn:
+            conn.close()
+
+if __name__ == "__main__":
+    add_links_fts()
@@ -0,0 +1,49 @@
+"""Add indexes used by the link and note listing queries."""
+
+import sqlite3
+import sys
+
+from .utils import already_applied, connect, mark_applied
+
+VERSION = 3
+
+INDEXES = {
+    "ix_links_created_at": "links(created_at)",
+    "ix_link_tags_tag_id": "link_tags(tag_id, link_id)",
+    "ix_notes_created_at": "notes(created_at)",
+}
+
+
+def add_list_indexes(db_path=None):
+    """Create listing indexes that are missing from the database."""
+    conn = None
+
+    try:
+        conn = connect(db_path)
+        cursor = conn.cursor()
+
+        if already_applied(cursor, VERSION):
+            print("✓ Migration for listing indexes already applied")
+            return
+
+        # Apply every change in a single write transaction
+        cursor.execute("BEGIN IMMEDIATE")
+        for name, target in INDEXES.items():
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+        mark_applied(cursor, VERSION)
+        cursor.execute("COMMIT")
+        cursor.execute("PRAGMA optimize")
+        print(f"✓ Ensured {len(INDEXES)} listing indexes exist")
+
+    except sqlite3.Error as e:
+        if conn and conn.in_transaction:
+            conn.rollback()
+        print(f"✗ Database error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if conn:
+            conn.close()
+
+if __name__ == "__main__":
+    add_list_indexes()
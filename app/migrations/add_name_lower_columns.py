@@ -0,0 +1,69 @@
+"""Add lowercased name columns and indexes to tags and collections tables."""
+
+import sqlite3
+import sys
+
+from .utils import already_applied, connect, has_column, mark_applied
+
+VERSION = 6
+
+NAME_LOWER_COLUMNS = {
+    "tags": "VARCHAR(50)",
+    "collections": "VARCHAR(100)",
+}
+
+
+def add_name_lower_columns(db_path=None):
+    """Add and backfill name_lower columns on tags and collections tables."""
+    conn = None
+
+    try:
+        conn = connect(db_path)
+        cursor = conn.cursor()
+
+        if already_applied(cursor, VERSION):
+            print("✓ Migration for 'name_lower' columns already applied")
+            return
+
+        missing = [
+            table for table in NAME_LOWER_COLUMNS if not has_column(cursor, table, "name_lower")
+        ]
+        if not missing:
+            mark_applied(cursor, VERSION)
+            print("✓ Column 'name_lower' already exists in tags and collections tables")
+            return
+
+        # Apply every change in a single write transaction
+        cursor.execute("BEGIN IMMEDIATE")
+        total = 0
+        for table in missing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN name_lower {NAME_LOWER_COLUMNS[table]}")
+
+            # Backfill in Python so non-ASCII names are lowercased the same way the app does it
+            rows = cursor.execute(f"SELECT id, name FROM {table}").fetchall()
+            cursor.executemany(
+                f"UPDATE {table} SET name_lower = ? WHERE id = ?",
+                [(name.lower() if name else None, row_id) for row_id, name in rows],
+            )
+            total += len(rows)
+
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_name_lower ON {table}(name_lower)"
+            )
+
+        mark_applied(cursor, VERSION)
+        cursor.execute("COMMIT")
+        cursor.execute("PRAGMA optimize")
+        print(f"✓ Successfully added 'name_lower' columns to {', '.join(missing)} ({total} rows)")
+
+    except sqlite3.Error as e:
+        if conn and conn.in_transaction:
+            conn.rollback()
+        print(f"✗ Database error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if conn:
+            conn.close()
+
+if __name__ == "__main__":
+    add_name_lower_columns()
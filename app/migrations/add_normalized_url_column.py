@@ -0,0 +1,67 @@
+"""Add normalized_url column and index to links table."""
+
+import sqlite3
+import sys
+
+from ..crud import normalize_url
+from .utils import already_applied, connect, has_column, mark_applied
+
+VERSION = 2
+
+
+def add_normalized_url_column(db_path=None):
+    """Add and backfill normalized_url column on links table."""
+    conn = None
+
+    try:
+        conn = connect(db_path)
+        cursor = conn.cursor()
+
+        if already_applied(cursor, VERSION):
+            print("✓ Migration for 'normalized_url' column already applied")
+            return
+
+        # Databases migrated before versions were tracked may already have the column
+        if has_column(cursor, "links", "normalized_url"):
+            mark_applied(cursor, VERSION)
+            print("✓ Column 'normalized_url' already exists in links table")
+            return
+
+        # Apply every change in a single write transaction
+        cursor.execute("BEGIN IMMEDIATE")
+        # Add the column
+        cursor.execute("""
+            ALTER TABLE links
+            ADD COLUMN normalized_url TEXT
+        """)
+
+        # Backfill from existing URLs
+        rows = cursor.execute("SELECT id, url FROM links").fetchall()
+        cursor.executemany(
+            "UPDATE links SET normalized_url = ? WHERE id = ?",
+            [(normalize_url(url), link_id) for link_id, url in rows],
+        )
+
+        # Plain rather than UNIQUE: links saved before duplicate detection may share a
+        # normalized URL, and a unique index would fail to build on those databases
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS ix_links_normalized_url
+            ON links(normalized_url)
+        """)
+
+        mark_applied(cursor, VERSION)
+        cursor.execute("COMMIT")
+        cursor.execute("PRAGMA optimize")
+        print(f"✓ Successfully added 'normalized_url' column to links table ({len(rows)} rows)")
+
+    except sqlite3.Error as e:
+        if conn and conn.in_transaction:
+            conn.rollback()
+        print(f"✗ Database error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if conn:
+            conn.close()
+
+if __name__ == "__main__":
+    add_normalized_url_column()
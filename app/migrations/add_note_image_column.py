@@ -0,0 +1,51 @@
+"""Add image_url column to notes table."""
+
+import sqlite3
+import sys
+
+from .utils import already_applied, connect, has_column, mark_applied
+
+VERSION = 1
+
+def add_image_column(db_path=None):
+    """Add image_url column to notes table."""
+    conn = None
+
+    try:
+        conn = connect(db_path)
+        cursor = conn.cursor()
+
+        if already_applied(cursor, VERSION):
+            print("✓ Migration for 'image_url' column already applied")
+            return
+
+        # Databases migrated before versions were tracked may already have the column
+        if has_column(cursor, "notes", "image_url"):
+            mark_applied(cursor, VERSION)
+            print("✓ Column 'image_url' already exists in notes table")
+            return
+
+        # Apply every change in a single write transaction
+        cursor.execute("BEGIN IMMEDIATE")
+        # Add the column
+        cursor.execute("""
+            ALTER TABLE notes
+            ADD COLUMN image_url VARCHAR(500)
+        """)
+
+        mark_applied(cursor, VERSION)
+        cursor.execute("COMMIT")
+        cursor.execute("PRAGMA optimize")
+        print("✓ Successfully added 'image_url' column to notes table")
+
+    except sqlite3.Error as e:
+        if conn and conn.in_transaction:
+            conn.rollback()
+        print(f"✗ Database error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if conn:
+            conn.close()
+
+if __name__ == "__main__":
+    add_image_column()
@@ -0,0 +1,68 @@
+"""Rebuild note_images with AUTOINCREMENT so deleted image ids are never reused."""
+
+import sqlite3
+import sys
+
+from .utils import already_applied, connect, mark_applied
+
+VERSION = 9
+
+
+def add_note_images_autoincrement(db_path=None):
+    """Recreate note_images as an AUTOINCREMENT table, keeping every stored image and its id."""
+    conn = None
+
+    try:
+        conn = connect(db_path)
+        cursor = conn.cursor()
+
+        if already_applied(cursor, VERSION):
+            print("✓ Migration for 'note_images' AUTOINCREMENT already applied")
+            return
+
+        # Databases created by the app after this change already declare AUTOINCREMENT
+        row = cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'note_images'"
+        ).fetchone()
+        if row is None or "AUTOINCREMENT" in row[0].upper():
+            mark_applied(cursor, VERSION)
+            print("✓ Table 'note_images' already uses AUTOINCREMENT")
+            return
+
+        # Apply every change in a single write transaction
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("""
+            CREATE TABLE note_images_new (
+                id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+                data BLOB NOT NULL,
+                content_type VARCHAR(50) NOT NULL,
+                created_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+                updated_at DATETIME DEFAULT (CURRENT_TIMESTAMP)
+            )
+        """)
+        # Copying explicit ids also advances sqlite_sequence past the highest one
+        cursor.execute("""
+            INSERT INTO note_images_new (id, data, content_type, created_at, updated_at)
+            SELECT id, data, content_type, created_at, updated_at FROM note_images
+        """)
+        cursor.execute("DROP TABLE note_images")
+        cursor.execute("ALTER TABLE note_images_new RENAME TO note_images")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_note_images_id ON note_images(id)")
+        count = cursor.execute("SELECT COUNT(*) FROM note_images").fetchone()[0]
+
+        mark_applied(cursor, VERSION)
+        cursor.execute("COMMIT")
+        cursor.execute("PRAGMA optimize")
+        print(f"✓ Successfully rebuilt 'note_images' with AUTOINCREMENT ({count} rows)")
+
+    except sqlite3.Error as e:
+        if conn and conn.in_transaction:
+            conn.rollback()
+        print(f"✗ Database error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if conn:
+            conn.close()
+
+if __name__ == "__main__":
+    add_note_images_autoincrement()
@@ -0,0 +1,85 @@
+"""Move note images stored as base64 data URLs into the note_images table."""
+
+import base64
+import binascii
+import sqlite3
+import sys
+
+from ..crud import NOTE_IMAGE_URL_PREFIX
+from .utils import already_applied, connect, mark_applied
+
+VERSION = 7
+
+DATA_URL_PREFIX = "data:"
+
+
+def _split_data_url(data_url):
+    """Return (bytes, content_type) for a base64 data URL, or None if it cannot be decoded."""
+    header, _, payload = data_url.partition(",")
+    content_type, _, encoding = header[len(DATA_URL_PREFIX):].partition(";")
+    if encoding != "base64" or not content_type:
+        return None
+    try:
+        return base64.b64decode(payload, validate=True), content_type
+    except (binascii.Error, ValueError):
+        return None
+
+
+def add_note_images_table(db_path=None):
+    """Create note_images and rewrite data URL note images to /images/{id} paths."""
+    conn = None
+
+    try:
+        conn = connect(db_path)
+        cursor = conn.cursor()
+
+        if already_applied(cursor, VERSION):
+            print("✓ Migration for 'note_images' table already applied")
+            return
+
+        # Apply every change in a single write transaction
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS note_images (
+                id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+                data BLOB NOT NULL,
+                content_type VARCHAR(50) NOT NULL,
+                created_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+                updated_at DATETIME DEFAULT (CURRENT_TIMESTAMP)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_note_images_id ON note_images(id)")
+
+        rows = cursor.execute(
+            "SELECT id, image_url FROM notes WHERE image_url LIKE 'data:%'"
+        ).fetchall()
+        moved = 0
+        for note_id, data_url in rows:
+            decoded = _split_data_url(data_url)
+            if decoded is None:
+                continue
+            cursor.execute(
+                "INSERT INTO note_images (data, content_type) VALUES (?, ?)", decoded
+            )
+            cursor.execute(
+                "UPDATE notes SET image_url = ? WHERE id = ?",
+                (f"{NOTE_IMAGE_URL_PREFIX}{cursor.lastrowid}", note_id),
+            )
+            moved += 1
+
+        mark_applied(cursor, VERSION)
+        cursor.execute("COMMIT")
+        cursor.execute("PRAGMA optimize")
+        print(f"✓ Successfully moved {moved} note image(s) into the note_images table")
+
+    except sqlite3.Error as e:
+        if conn and conn.in_transaction:
+            conn.rollback()
+        print(f"✗ Database error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if conn:
+            conn.close()
+
+if __name__ == "__main__":
+    add_note_images_table()
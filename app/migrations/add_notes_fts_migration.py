@@ -0,0 +1,54 @@
+"""Add trigram full-text search index over notes."""
+
+import sqlite3
+import sys
+
+from ..models import NOTES_FTS_DDL
+from .utils import already_applied, connect, mark_applied
+
+VERSION = 8
+
+
+def add_notes_fts(db_path=None):
+    """Create notes_fts with its sync triggers and index existing notes."""
+    conn = None
+
+    try:
+        conn = connect(db_path)
+        cursor = conn.cursor()
+
+        if already_applied(cursor, VERSION):
+            print("✓ Migration for notes full-text index already applied")
+            return
+
+        # Databases created by the app already get notes_fts from create_all
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'notes_fts'")
+        if cursor.fetchone() is not None:
+            mark_applied(cursor, VERSION)
+            print("✓ Full-text index 'notes_fts' already exists")
+            return
+
+        # Apply every change in a single write transaction
+        cursor.execute("BEGIN IMMEDIATE")
+        for statement in NOTES_FTS_DDL:
+            cursor.execute(statement)
+
+        # Index the notes that existed before the triggers were installed
+        cursor.execute("INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')")
+
+        mark_applied(cursor, VERSION)
+        cursor.execute("COMMIT")
+        cursor.execute("PRAGMA optimize")
+        print("✓ Successfully created full-text index 'notes_fts'")
+
+    except sqlite3.Error as e:
+        if conn and conn.in_transaction:
+            conn.rollback()
+        print(f"✗ Database error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if conn:
+            conn.close()
+
+if __name__ == "__main__":
+    add_notes_fts()
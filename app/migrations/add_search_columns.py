@@ -0,0 +1,69 @@
+"""Add lowercased search columns to links table."""
+
+import sqlite3
+import sys
+
+from .utils import already_applied, connect, has_column, mark_applied
+
+VERSION = 4
+
+SEARCH_COLUMNS = {
+    "title_lower": "VARCHAR(255)",
+    "url_lower": "TEXT",
+    "notes_lower": "TEXT",
+}
+
+
+def _lower(value):
+    return value.lower() if value else None
+
+
+def add_search_columns(db_path=None):
+    """Add and backfill lowercased title/url/notes columns on links table."""
+    conn = None
+
+    try:
+        conn = connect(db_path)
+        cursor = conn.cursor()
+
+        if already_applied(cursor, VERSION):
+            print("✓ Migration for search columns already applied")
+            return
+
+        missing = [name for name in SEARCH_COLUMNS if not has_column(cursor, "links", name)]
+        if not missing:
+            mark_applied(cursor, VERSION)
+            print("✓ Search columns already exist in links table")
+            return
+
+        # Apply every change in a single write transaction
+        cursor.execute("BEGIN IMMEDIATE")
+        for name in missing:
+            cursor.execute(f"ALTER TABLE links ADD COLUMN {name} {SEARCH_COLUMNS[name]}")
+
+        # Backfill in Python so non-ASCII text is lowercased the same way the app does it
+        rows = cursor.execute("SELECT id, title, url, notes FROM links").fetchall()
+        cursor.executemany(
+            "UPDATE links SET title_lower = ?, url_lower = ?, notes_lower = ? WHERE id = ?",
+            [
+                (_lower(title), _lower(url), _lower(notes), link_id)
+                for link_id, title, url, notes in rows
+            ],
+        )
+
+        mark_applied(cursor, VERSION)
+        cursor.execute("COMMIT")
+        cursor.execute("PRAGMA optimize")
+        print(f"✓ Successfully added search columns to links table ({len(rows)} rows)")
+
+    except sqlite3.Error as e:
+        if conn and conn.in_transaction:
+            conn.rollback()
+        print(f"✗ Database error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if conn:
+            conn.close()
+
+if __name__ == "__main__":
+    add_search_columns()
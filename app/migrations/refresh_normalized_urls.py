@@ -0,0 +1,51 @@
+"""Recompute normalized_url for links stored before UTM parameters were stripped as text."""
+
+import sqlite3
+import sys
+
+from ..crud import normalize_url
+from .utils import already_applied, connect, mark_applied
+
+VERSION = 10
+
+
+def refresh_normalized_urls(db_path=None):
+    """Rewrite stored normalized_url values that differ from what normalize_url returns now."""
+    conn = None
+
+    try:
+        conn = connect(db_path)
+        cursor = conn.cursor()
+
+        if already_applied(cursor, VERSION):
+            print("✓ Migration refreshing 'normalized_url' already applied")
+            return
+
+        # Apply every change in a single write transaction
+        cursor.execute("BEGIN IMMEDIATE")
+        # Only URLs carrying a UTM parameter were ever rewritten by the old rule
+        rows = cursor.execute(
+            "SELECT id, url, normalized_url FROM links WHERE url LIKE '%utm\\_%' ESCAPE '\\'"
+        ).fetchall()
+        updates = [
+            (normalized, link_id)
+            for link_id, url, stored in rows
+            if (normalized := normalize_url(url)) != stored
+        ]
+        cursor.executemany("UPDATE links SET normalized_url = ? WHERE id = ?", updates)
+
+        mark_applied(cursor, VERSION)
+        cursor.execute("COMMIT")
+        print(f"✓ Successfully refreshed 'normalized_url' on links table ({len(updates)} rows)")
+
+    except sqlite3.Error as e:
+        if conn and conn.in_transaction:
+            conn.rollback()
+        print(f"✗ Database error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if conn:
+            conn.close()
+
+if __name__ == "__main__":
+    refresh_normalized_urls()
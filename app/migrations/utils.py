@@ -0,0 +1,49 @@
+"""Shared helpers for the standalone SQLite migration scripts."""
+
+import sqlite3
+
+from sqlalchemy.engine import make_url
+
+from ..config import get_settings
+from ..database import apply_sqlite_pragmas
+
+
+def database_path() -> str | None:
+    """Return the SQLite file named by DATABASE_URL, or None when there is no file to migrate."""
+    url = make_url(get_settings().database_url)
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return None
+    return url.database
+
+
+def connect(db_path: str | None = None) -> sqlite3.Connection:
+    """Open the database to migrate in autocommit mode with the app's pragmas applied."""
+    db_path = db_path or database_path()
+    if db_path is None:
+        raise sqlite3.OperationalError("DATABASE_URL does not point at a SQLite database file")
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    apply_sqlite_pragmas(conn)
+    return conn
+
+
+def has_column(cursor: sqlite3.Cursor, table: str, column: str) -> bool:
+    """Return True if the table already has the given column."""
+    cursor.execute("SELECT 1 FROM pragma_table_info(?) WHERE name = ?", (table, column))
+    return cursor.fetchone() is not None
+
+
+def already_applied(cursor: sqlite3.Cursor, version: int) -> bool:
+    """Return True if the migration with this version has been recorded."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("SELECT 1 FROM schema_migrations WHERE version = ?", (version,))
+    return cursor.fetchone() is not None
+
+
+def mark_applied(cursor: sqlite3.Cursor, version: int) -> None:
+    """Record that the migration with this version has been applied."""
+    cursor.execute("INSERT OR IGNORE INTO schema_migrations (version) VALUES (?)", (version,))
@@ -4,22 +4,69 @@ from datetime import datetime
 
 from slugify import slugify
 from sqlalchemy import (
+    DDL,
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
+    LargeBinary,
     String,
     Table,
     Text,
     event,
     func,
+    inspect,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .database import Base
 
+# Trigram-tokenized full-text index over link text, kept in sync with the links table by triggers
+LINKS_FTS_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS links_fts USING fts5(
+        title, url, notes, content='links', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS links_fts_ai AFTER INSERT ON links BEGIN
+        INSERT INTO links_fts(rowid, title, url, notes)
+        VALUES (new.id, new.title, new.url, new.notes);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS links_fts_ad AFTER DELETE ON links BEGIN
+        INSERT INTO links_fts(links_fts, rowid, title, url, notes)
+        VALUES ('delete', old.id, old.title, old.url, old.notes);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS links_fts_au AFTER UPDATE OF title, url, notes ON links BEGIN
+        INSERT INTO links_fts(links_fts, rowid, title, url, notes)
+        VALUES ('delete', old.id, old.title, old.url, old.notes);
+        INSERT INTO links_fts(rowid, title, url, notes)
+        VALUES (new.id, new.title, new.url, new.notes);
+    END""",
+)
+
+# The same trigram index over note titles and content
+NOTES_FTS_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+        title, content, content='notes', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS notes_fts_ai AFTER INSERT ON notes BEGIN
+        INSERT INTO notes_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS notes_fts_ad AFTER DELETE ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS notes_fts_au AFTER UPDATE OF title, content ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO notes_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+)
+
 
 class TimestampMixin:
+    # Read updated_at back through RETURNING on UPDATE instead of reloading the row afterwards
+    __mapper_args__ = {"eager_defaults": True}
+
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
@@ -31,6 +78,7 @@ link_tag_table = Table(
     Base.metadata,
     Column("link_id", ForeignKey("links.id", ondelete="CASCADE"), primary_key=True),
     Column("tag_id", ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_link_tags_tag_id", "tag_id", "link_id"),
 )
 
 note_tag_table = Table(
@@ -47,9 +95,12 @@ class Collection(Base, TimestampMixin):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
     slug: Mapped[str] = mapped_column(String(120), unique=True, nullable=False)
+    # Lowercased name for case-insensitive lookups, kept in sync by the event hooks below
+    name_lower: Mapped[str | None] = mapped_column(String(100), index=True)
 
-    links: Mapped[list[Link]] = relationship("Link", back_populates="collection", lazy="selectin")
-    notes: Mapped[list[Note]] = relationship("Note", back_populates="collection", lazy="selectin")
+    # Loaded only on access; eager loading here pulled every link and note of the collection
+    links: Mapped[list[Link]] = relationship("Link", back_populates="collection")
+    notes: Mapped[list[Note]] = relationship("Note", back_populates="collection")
 
 
 class Tag(Base, TimestampMixin):
@@ -58,26 +109,38 @@ class Tag(Base, TimestampMixin):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
     slug: Mapped[str] = mapped_column(String(60), unique=True, nullable=False)
+    # Lowercased name for case-insensitive lookups, kept in sync by the event hooks below
+    name_lower: Mapped[str | None] = mapped_column(String(50), index=True)
     icon: Mapped[str | None] = mapped_column(String(50))  # Icon name/identifier
     color: Mapped[str | None] = mapped_column(String(20))  # Color for the icon
 
+    # Loaded only on access; eager loading here pulled every item sharing a tag
     links: Mapped[list[Link]] = relationship(
-        "Link", secondary=link_tag_table, back_populates="tags", lazy="selectin"
+        "Link", secondary=link_tag_table, back_populates="tags"
     )
     notes: Mapped[list[Note]] = relationship(
-        "Note", secondary=note_tag_table, back_populates="tags", lazy="selectin"
+        "Note", secondary=note_tag_table, back_populates="tags"
     )
 
 
 class Link(Base, TimestampMixin):
     __tablename__ = "links"
+    __table_args__ = (Index("ix_links_created_at", "created_at"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     url: Mapped[str] = mapped_column(Text, nullable=False)
+    # URL with tracking parameters stripped, used for duplicate detection. The index is not
+    # UNIQUE: databases saved before this column existed can hold several links per URL
+    normalized_url: Mapped[str | None] = mapped_column(Text, index=True)
     title: Mapped[str | None] = mapped_column(String(255))
     notes: Mapped[str | None] = mapped_column(Text)
     image_url: Mapped[str | None] = mapped_column(Text)  # Preview image URL from og:image
 
+    # Lowercased copies of the searchable text, kept in sync by the event hooks below
+    title_lower: Mapped[str | None] = mapped_column(String(255))
+    url_lower: Mapped[str | None] = mapped_column(Text)
+    notes_lower: Mapped[str | None] = mapped_column(Text)
+
     # Image checking metadata
     image_checked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     image_check_status: Mapped[str | None] = mapped_column(
@@ -101,6 +164,7 @@ class Link(Base, TimestampMixin):
 
 class Note(Base, TimestampMixin):
     __tablename__ = "notes"
+    __table_args__ = (Index("ix_notes_created_at", "created_at"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -115,29 +179,90 @@ class Note(Base, TimestampMixin):
     )
 
 
+class NoteImage(Base, TimestampMixin):
+    """Compressed note image bytes, served by the /images/{id} route."""
+
+    __tablename__ = "note_images"
+    # Image URLs are cached as immutable, so ids of deleted images must never be handed out again
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    content_type: Mapped[str] = mapped_column(String(50), nullable=False)
+
+
 @event.listens_for(Collection, "before_insert")
 def collection_before_insert(mapper, connection, target: Collection) -> None:  # noqa: D401
-    """Ensure slug stays synced before inserting."""
+    """Ensure slug and lowercased name stay synced before inserting."""
 
     target.slug = slugify(target.name)
+    target.name_lower = target.name.lower()
 
 
 @event.listens_for(Collection, "before_update")
 def collection_before_update(mapper, connection, target: Collection) -> None:  # noqa: D401
-    """Ensure slug stays synced before updating."""
+    """Ensure slug and lowercased name stay synced before updating."""
 
-    target.slug = slugify(target.name)
+    if inspect(target).attrs.name.history.has_changes():
+        target.slug = slugify(target.name)
+        target.name_lower = target.name.lower()
 
 
 @event.listens_for(Tag, "before_insert")
 def tag_before_insert(mapper, connection, target: Tag) -> None:  # noqa: D401
-    """Keep tag slug synced before insert."""
+    """Keep tag slug and lowercased name synced before insert."""
 
     target.slug = slugify(target.name)
+    target.name_lower = target.name.lower()
 
 
 @event.listens_for(Tag, "before_update")
 def tag_before_update(mapper, connection, target: Tag) -> None:  # noqa: D401
-    """Keep tag slug synced before update."""
+    """Keep tag slug and lowercased name synced before update."""
 
-    target.slug = slugify(target.name)
+    if inspect(target).attrs.name.history.has_changes():
+        target.slug = slugify(target.name)
+        target.name_lower = target.name.lower()
+
+
+def _sync_link_search_columns(target: Link) -> None:
+    target.title_lower = target.title.lower() if target.title else None
+    target.url_lower = target.url.lower() if target.url else None
+    target.notes_lower = target.notes.lower() if target.notes else None
+
+
+@event.listens_for(Link, "before_insert")
+def link_before_insert(mapper, connection, target: Link) -> None:  # noqa: D401
+    """Keep lowercased search columns synced before insert."""
+
+    _sync_link_search_columns(target)
+
+
+@event.listens_for(Link, "before_update")
+def link_before_update(mapper, connection, target: Link) -> None:  # noqa: D401
+    """Keep lowercased search columns synced before update."""
+
+    _sync_link_search_columns(target)
+
+
+def supports_trigram_fts(ddl, target, bind, **kw) -> bool:
+    """Return True when the SQLite build has FTS5 with the trigram tokenizer (3.34+)."""
+    if bind.dialect.name != "sqlite" or bind.dialect.dbapi.sqlite_version_info < (3, 34, 0):
+        return False
+    options = bind.exec_driver_sql("PRAGMA compile_options").scalars().all()
+    return "ENABLE_FTS5" in options
+
+
+for _table, _fts_table, _statements in (
+    (Link.__table__, "links_fts", LINKS_FTS_DDL),
+    (Note.__table__, "notes_fts", NOTES_FTS_DDL),
+):
+    for _statement in _statements:
+        event.listen(
+            _table, "after_create", DDL(_statement).execute_if(callable_=supports_trigram_fts)
+        )
+    event.listen(
+        _table,
+        "after_drop",
+        DDL(f"DROP TABLE IF EXISTS {_fts_table}").execute_if(dialect="sqlite"),
+    )
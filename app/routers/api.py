@@ -1,16 +1,33 @@
 from __future__ import annotations
 
-from typing import Annotated
-
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+import hashlib
+from collections.abc import Iterator, Sequence
+from datetime import date, datetime
+from typing import Annotated, Literal
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
 from sqlalchemy.orm import Session
 
 from ..crud import (
+    cached_listing,
     create_link,
     create_note,
-    delete_link,
-    delete_note,
-    # export_all_links,
+    decode_cursor,
+    delete_link_by_id,
+    delete_note_by_id,
+    encode_cursor,
+    export_all_links,
     get_link,
     get_link_by_url,
     get_note,
@@ -21,16 +38,62 @@ from ..crud import (
     update_link,
     update_note,
 )
-from ..database import get_db
+from ..database import SessionLocal, get_db
 from ..link_preview import fetch_link_metadata
+from ..models import Link, Note
 from ..schemas import LinkCreate, LinkRead, LinkUpdate, NoteCreate, NoteRead, NoteUpdate, PaginatedLinks, PaginatedNotes
-from ..tasks import needs_title_refresh, refresh_link_title_if_placeholder
+from ..tasks import (
+    needs_metadata_refresh,
+    needs_title_refresh,
+    schedule_metadata_refresh,
+)
 
 router = APIRouter(prefix="/api", tags=["links"])
 
+LINKS_ADAPTER = TypeAdapter(list[LinkRead])
+LINK_ADAPTER = TypeAdapter(LinkRead)
+
 SessionDep = Annotated[Session, Depends(get_db)]
 
 
+def _parse_cursor(cursor: str | None) -> tuple[datetime, int] | None:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from None
+
+
+def _conditional_json(request: Request, model: BaseModel) -> Response:
+    """Send ``model`` as JSON tagged with a content hash, or 304 if the client already has it."""
+    # Hashing the body also catches changes to tags and collections, which leave updated_at alone
+    body = model.model_dump_json().encode()
+    etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+def _page_response(
+    rows: Sequence[Link] | Sequence[Note], total: int | None, page: int, page_size: int
+) -> dict[str, object]:
+    items = rows[:page_size]
+    has_more = len(rows) > page_size if total is None else page * page_size < total
+    # The response model validates the ORM rows once; building Read models here would do it twice
+    return {
+        "items": items,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "has_more": has_more,
+        "next_cursor": encode_cursor(items[-1].created_at, items[-1].id) if has_more else None,
+    }
+
+
 @router.post("/links", response_model=LinkRead, status_code=status.HTTP_201_CREATED)
 def api_create_link(
     payload: LinkCreate,
@@ -54,8 +117,8 @@ def api_create_link(
     link = create_link(session, payload)
     session.commit()
 
-    if needs_title_refresh(link):
-        background_tasks.add_task(refresh_link_title_if_placeholder, link.id)
+    if needs_metadata_refresh(link):
+        schedule_metadata_refresh(background_tasks, link.id)
     
     return LinkRead.model_validate(link)
 
@@ -67,35 +130,73 @@ def api_list_links(
     collection: str | None = Query(None, description="Filter by collection slug"),
     page: int = Query(1, ge=1),
     page_size: int = Query(25, ge=1, le=200),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
     *,
     session: SessionDep,
-) -> PaginatedLinks:
+) -> dict[str, object]:
+    after = _parse_cursor(cursor)
+    # Cursor pages skip the COUNT and read one extra row to tell whether another page follows
     results, total = list_links(
         session,
         search=search,
         tag=tag,
         collection=collection,
         page=page,
-        page_size=page_size,
-    )
-    return PaginatedLinks(
-        items=[LinkRead.model_validate(row) for row in results],
-        total=total,
-        page=page,
-        page_size=page_size,
+        page_size=page_size + 1 if after else page_size,
+        after=after,
+        with_total=after is None,
     )
+    return _page_response(results, total, page, page_size)
+
+
+def _export_links_json() -> Iterator[bytes]:
+    # The request's session is closed once the handler returns, so the stream opens its own
+    with SessionLocal() as session:
+        yield b"["
+        separator = b""
+        for batch in export_all_links(session).partitions():
+            # Drop the adapter's own brackets so batches join into one array
+            yield separator + LINKS_ADAPTER.dump_json(
+                LINKS_ADAPTER.validate_python(batch, from_attributes=True)
+            )[1:-1]
+            separator = b","
+        yield b"]"
+
+
+def _export_links_ndjson() -> Iterator[bytes]:
+    with SessionLocal() as session:
+        for batch in export_all_links(session).partitions():
+            yield b"".join(
+                LINK_ADAPTER.dump_json(LINK_ADAPTER.validate_python(link, from_attributes=True))
+                + b"\n"
+                for link in batch
+            )
+
+
+# Declared before /links/{link_id} so "export" is not parsed as a link id
+@router.get("/links/export", response_model=list[LinkRead])
+def api_export_links(
+    format: Literal["json", "ndjson"] = Query(
+        "json", description="json for one array, ndjson for one link per line"
+    ),
+) -> StreamingResponse:
+    """Stream every link without holding the whole export in memory."""
+    if format == "ndjson":
+        return StreamingResponse(_export_links_ndjson(), media_type="application/x-ndjson")
+    return StreamingResponse(_export_links_json(), media_type="application/json")
 
 
 @router.get("/links/{link_id}", response_model=LinkRead)
 def api_get_link(
     link_id: int,
+    request: Request,
     *,
     session: SessionDep,
-) -> LinkRead:
+) -> Response:
     link = get_link(session, link_id)
     if not link:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Link not found")
-    return LinkRead.model_validate(link)
+    return _conditional_json(request, LinkRead.model_validate(link))
 
 
 @router.patch("/links/{link_id}", response_model=LinkRead)
@@ -113,7 +214,7 @@ def api_update_link(
     session.commit()
 
     if needs_title_refresh(updated):
-        background_tasks.add_task(refresh_link_title_if_placeholder, updated.id)
+        schedule_metadata_refresh(background_tasks, updated.id, title_only=True)
 
     return LinkRead.model_validate(updated)
 
@@ -124,10 +225,8 @@ def api_delete_link(
     *,
     session: SessionDep,
 ) -> None:
-    link = get_link(session, link_id)
-    if not link:
+    if not delete_link_by_id(session, link_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Link not found")
-    delete_link(session, link)
     session.commit()
 
 
@@ -136,8 +235,10 @@ def api_list_tags(
     *,
     session: SessionDep,
 ) -> list[dict[str, str | int]]:
-    tags = list_tags(session)
-    return [{"id": tag.id, "name": tag.name, "slug": tag.slug} for tag in tags]
+    return cached_listing(
+        "tags",
+        lambda: [{"id": tag.id, "name": tag.name, "slug": tag.slug} for tag in list_tags(session)],
+    )
 
 
 @router.get("/collections")
@@ -145,25 +246,17 @@ def api_list_collections(
     *,
     session: SessionDep,
 ) -> list[dict[str, str | int]]:
-    collections = list_collections(session)
-    return [
-        {
-            "id": collection.id,
-            "name": collection.name,
-            "slug": collection.slug,
-        }
-        for collection in collections
-    ]
-
-
-@router.get("/links/export", response_model=list[LinkRead])
-def api_export_links(
-    *,
-    session: SessionDep,
-) -> list[LinkRead]:
-    # links = export_all_links(session)
-    links = list_links(session, page_size=-1)[0]  # Use list_links to get all
-    return [LinkRead.model_validate(row) for row in links]
+    return cached_listing(
+        "collections",
+        lambda: [
+            {
+                "id": collection.id,
+                "name": collection.name,
+                "slug": collection.slug,
+            }
+            for collection in list_collections(session)
+        ],
+    )
 
 
 @router.get("/preview")
@@ -200,34 +293,35 @@ def api_list_notes(
     search: str | None = Query(None, description="Search in title and content"),
     tags: list[str] | None = Query(None, description="Filter by tag slugs"),
     collections: list[str] | None = Query(None, description="Filter by collection slugs"),
-    date_from: str | None = Query(None, description="Filter from date (YYYY-MM-DD)"),
-    date_to: str | None = Query(None, description="Filter to date (YYYY-MM-DD)"),
-) -> PaginatedNotes:
+    date_from: date | None = Query(None, description="Filter from date (YYYY-MM-DD)"),
+    date_to: date | None = Query(None, description="Filter to date (YYYY-MM-DD), inclusive"),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+) -> dict[str, object]:
     """List notes with filtering and pagination."""
+    after = _parse_cursor(cursor)
+    # Cursor pages skip the COUNT and read one extra row to tell whether another page follows
     notes, total = list_notes(
         session,
         page=page,
-        page_size=page_size,
+        page_size=page_size + 1 if after else page_size,
         search=search,
         tags=tags,
         collections=collections,
         date_from=date_from,
         date_to=date_to,
+        after=after,
+        with_total=after is None,
     )
-    return PaginatedNotes(
-        items=[NoteRead.model_validate(note) for note in notes],
-        total=total,
-        page=page,
-        page_size=page_size,
-    )
+    return _page_response(notes, total, page, page_size)
 
 
 @router.get("/notes/{note_id}", response_model=NoteRead)
 def api_get_note(
     note_id: int,
+    request: Request,
     *,
     session: SessionDep,
-) -> NoteRead:
+) -> Response:
     """Get a single note by ID."""
     note = get_note(session, note_id)
     if not note:
@@ -235,7 +329,7 @@ def api_get_note(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Note not found",
         )
-    return NoteRead.model_validate(note)
+    return _conditional_json(request, NoteRead.model_validate(note))
 
 
 @router.patch("/notes/{note_id}", response_model=NoteRead)
@@ -255,7 +349,6 @@ def api_update_note(
 
     note = update_note(session, note, payload)
     session.commit()
-    session.refresh(note)
     return NoteRead.model_validate(note)
 
 
@@ -266,12 +359,9 @@ def api_delete_note(
     session: SessionDep,
 ) -> None:
     """Delete a note."""
-    note = get_note(session, note_id)
-    if not note:
+    if not delete_note_by_id(session, note_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Note not found",
         )
-
-    delete_note(session, note)
     session.commit()
@@ -1,7 +1,12 @@
 from __future__ import annotations
 
-from datetime import datetime
+import codecs
+import csv
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
+from typing import Annotated, Any
 
 from fastapi import (
     APIRouter,
@@ -15,51 +20,65 @@ from fastapi import (
     BackgroundTasks
 )
 from fastapi.params import Depends
-from fastapi.responses import RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
 from fastapi.templating import Jinja2Templates
+from jinja2 import Template, pass_context
+from jinja2.runtime import Context
 from sqlalchemy.orm import Session
 
 from ..crud import (
     create_collection,
     create_link,
+    create_links,
     create_note,
+    create_note_image,
     create_tag,
     delete_collection,
-    delete_link,
-    delete_note,
+    delete_link_by_id,
+    delete_note_by_id,
     delete_tag,
+    find_existing_normalized_urls,
     get_collection,
     get_default_tags,
     get_link,
     get_note,
+    get_note_image,
     get_tag,
-    has_broken_links,
     list_all_collections,
     list_all_tags,
     list_collections,
     list_collections_with_counts,
     list_links,
     list_notes,
-    list_tags,
     list_tags_with_counts,
+    load_links_sidebar,
+    normalize_url,
+    note_image_url,
+    parse_date_param,
     update_collection,
     update_link,
     update_note,
     update_tag,
 )
-from ..database import SessionLocal, get_db
-from ..image_utils import compress_image, validate_image
+from ..database import get_db
+from ..icons import COLOR_OPTIONS, ICON_LIBRARY
+from ..image_utils import compress_image_async, validate_image
 from ..schemas import LinkCreate, LinkUpdate, NoteCreate, NoteUpdate
-from ..tasks import needs_title_refresh, refresh_link_title_if_placeholder
+from ..tasks import (
+    needs_metadata_refresh,
+    needs_title_refresh,
+    schedule_metadata_refresh,
+)
 
 router = APIRouter()
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+SessionDep = Annotated[Session, Depends(get_db)]
 
+# CSV rows are flushed in batches this size so large uploads never hold every link in memory
+CSV_IMPORT_BATCH_SIZE = 500
 
-def _get_session() -> Session:
-    return SessionLocal()
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 
 
 def format_date(dt: datetime) -> str:
@@ -67,37 +86,46 @@ def format_date(dt: datetime) -> str:
     return dt.strftime("%m/%d/%Y")
 
 
-def relative_time(dt: datetime) -> str:
+# (exclusive upper bound in seconds, seconds per unit, singular, plural), checked in order
+RELATIVE_TIME_UNITS = (
+    (3600, 60, "{} minute ago", "{} minutes ago"),
+    (86400, 3600, "{} hour ago", "{} hours ago"),
+    (2592000, 86400, "{} day ago", "{} days ago"),  # 30 days
+    (31536000, 2592000, "{} month ago", "{} months ago"),  # 365 days
+    (float("inf"), 31536000, "{} year ago", "{} years ago"),
+)
+
+
+def relative_time(dt: datetime, now: datetime | None = None) -> str:
     """Return relative time string like '1 year ago', '3 months ago', etc."""
-    now = datetime.now(dt.tzinfo) if dt.tzinfo else datetime.now()
-    diff = now - dt
-    
-    seconds = diff.total_seconds()
-    
-    if seconds < 60:
+    if now is None or (now.tzinfo is None) != (dt.tzinfo is None):
+        now = datetime.now(dt.tzinfo) if dt.tzinfo else datetime.now()
+    # Every unit is a whole number of minutes, so the label only depends on elapsed minutes
+    return _relative_time_label(int((now - dt).total_seconds() // 60))
+
+
+@lru_cache(maxsize=1024)
+def _relative_time_label(minutes: int) -> str:
+    if minutes < 1:
         return "just now"
-    elif seconds < 3600:
-        minutes = int(seconds / 60)
-        return f"{minutes} minute{'s' if minutes != 1 else ''} ago"
-    elif seconds < 86400:
-        hours = int(seconds / 3600)
-        return f"{hours} hour{'s' if hours != 1 else ''} ago"
-    elif seconds < 2592000:  # 30 days
-        days = int(seconds / 86400)
-        return f"{days} day{'s' if days != 1 else ''} ago"
-    elif seconds < 31536000:  # 365 days
-        months = int(seconds / 2592000)
-        return f"{months} month{'s' if months != 1 else ''} ago"
-    else:
-        years = int(seconds / 31536000)
-        return f"{years} year{'s' if years != 1 else ''} ago"
+
+    seconds = minutes * 60
+    # The last unit has no upper bound, so it is only the fallback for the type checker
+    _, unit_seconds, singular, plural = next(
+        (unit for unit in RELATIVE_TIME_UNITS if seconds < unit[0]), RELATIVE_TIME_UNITS[-1]
+    )
+    count = seconds // unit_seconds
+    return (singular if count == 1 else plural).format(count)
+
+
+@pass_context
+def relative_time_filter(context: Context, dt: datetime) -> str:
+    # Pages pass one "now" for the whole render instead of reading the clock per row
+    return relative_time(dt, context.get("now"))
 
 
 def group_links_by_date(links):
     """Group links by date categories: Today, Yesterday, This Week, etc."""
-    from collections import defaultdict
-    from datetime import timedelta
-
     now = datetime.now()
     today = now.date()
     yesterday = today - timedelta(days=1)
@@ -149,7 +177,19 @@ def group_links_by_date(links):
 
 
 templates.env.filters["format_date"] = format_date
-templates.env.filters["relative_time"] = relative_time
+templates.env.filters["relative_time"] = relative_time_filter
+
+# Compiled once at import so each render skips the loader's name lookup and mtime check
+LINK_DETAIL_TEMPLATE = templates.get_template("link_detail.html")
+LINKS_TEMPLATE = templates.get_template("links.html")
+ADD_TEMPLATE = templates.get_template("add.html")
+SETTINGS_TEMPLATE = templates.get_template("settings.html")
+NOTE_DETAIL_TEMPLATE = templates.get_template("note_detail.html")
+
+
+def render_page(template: Template, context: dict[str, Any]) -> HTMLResponse:
+    """Render a precompiled page template into an HTML response."""
+    return HTMLResponse(template.render(context))
 
 
 @router.get("/")
@@ -157,38 +197,48 @@ def root() -> RedirectResponse:
     return RedirectResponse(url="/links", status_code=status.HTTP_302_FOUND)
 
 
+@router.get("/images/{image_id}")
+def note_image_view(image_id: int, *, session: SessionDep):
+    """Serve an uploaded note image; its bytes never change, so browsers may cache it forever"""
+    image = get_note_image(session, image_id)
+    if not image:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+    return Response(
+        content=image.data,
+        media_type=image.content_type,
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
+
+
 @router.get("/links/{link_id}")
-def link_detail_view(request: Request, link_id: int):
+def link_detail_view(request: Request, link_id: int, *, session: SessionDep):
     """View a single link with all details"""
-    session = _get_session()
-    try:
-        link = get_link(session, link_id)
-        if not link:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Link not found")
-        collections = list_all_collections(session)
-        available_tag_entities = list_all_tags(session)
-        available_tags = [
-            {
-                "name": tag.name,
-                "slug": tag.slug,
-                "icon": tag.icon,
-                "color": tag.color,
-            }
-            for tag in available_tag_entities
-            if tag.name
-        ]
-        available_tags.sort(key=lambda item: item["name"].lower())
-        return templates.TemplateResponse(
-            "link_detail.html",
-            {
-                "request": request,
-                "link": link,
-                "collections": collections,
-                "available_tags": available_tags,
-            },
-        )
-    finally:
-        session.close()
+    link = get_link(session, link_id)
+    if not link:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Link not found")
+    collections = list_all_collections(session)
+    available_tag_entities = list_all_tags(session)
+    available_tags = [
+        {
+            "name": tag.name,
+            "slug": tag.slug,
+            "icon": tag.icon,
+            "color": tag.color,
+        }
+        for tag in available_tag_entities
+        if tag.name
+    ]
+    available_tags.sort(key=lambda item: item["name"].lower())
+    return render_page(
+        LINK_DETAIL_TEMPLATE,
+        {
+            "request": request,
+            "now": datetime.now(),
+            "link": link,
+            "collections": collections,
+            "available_tags": available_tags,
+        },
+    )
 
 
 @router.get("/links")
@@ -206,68 +256,66 @@ def list_links_view(
     page: int = Query(1, ge=1),
     page_size: int = Query(25, ge=1, le=200),
     updated: int = Query(0),
+    *,
+    session: SessionDep,
 ):
-    session = _get_session()
-    try:
-        links, total_links = list_links(
-            session,
-            search=search,
-            tag=tag,
-            tags=tags,
-            collection=collection,
-            collections=collections,
-            has_notes=has_notes,
-            date_from=date_from,
-            date_to=date_to,
-            broken=broken,
-            page=page,
-            page_size=page_size,
-        )
-        
-        # Also fetch notes with same filters
-        notes, total_notes = list_notes(
-            session,
-            search=search,
-            tag=tag,
-            tags=tags,
-            collection=collection,
-            collections=collections,
-            date_from=date_from,
-            date_to=date_to,
-            page=page,
-            page_size=page_size,
-        )
-        
-        tags_list = list_tags(session)
-        collections_list = list_all_collections(session)
-        collection_summaries = list_collections_with_counts(session)
-        top_collection_summaries = sorted(
-            collection_summaries,
-            key=lambda item: item[1],
-            reverse=True,
-        )[:6]
-
-        # Combine and group links and notes by date
-        combined_items = list(links) + list(notes)
-        grouped_items = group_links_by_date(combined_items)
-
-        # Check if there are any broken links
-        any_broken_links = has_broken_links(session)
-    finally:
-        session.close()
-    return templates.TemplateResponse(
-        "links.html",
+    # Blank date inputs arrive as empty strings, so they are parsed here rather than by FastAPI
+    from_day = parse_date_param(date_from)
+    to_day = parse_date_param(date_to)
+    links, total_links = list_links(
+        session,
+        search=search,
+        tag=tag,
+        tags=tags,
+        collection=collection,
+        collections=collections,
+        has_notes=has_notes,
+        date_from=from_day,
+        date_to=to_day,
+        broken=broken,
+        page=page,
+        page_size=page_size,
+    )
+    
+    # Also fetch notes with same filters
+    notes, total_notes = list_notes(
+        session,
+        search=search,
+        tag=tag,
+        tags=tags,
+        collection=collection,
+        collections=collections,
+        date_from=from_day,
+        date_to=to_day,
+        page=page,
+        page_size=page_size,
+    )
+    
+    sidebar = load_links_sidebar(session)
+    top_collection_summaries = sorted(
+        sidebar.collection_summaries,
+        key=lambda item: item[1],
+        reverse=True,
+    )[:6]
+
+    # Combine and group links and notes by date
+    combined_items = list(links) + list(notes)
+    grouped_items = group_links_by_date(combined_items)
+
+    return render_page(
+        LINKS_TEMPLATE,
         {
             "request": request,
+            "now": datetime.now(),
             "links": links,
             "notes": notes,
             "grouped_links": grouped_items,  # Contains both links and notes
             "total": total_links + total_notes,
             "page": page,
             "page_size": page_size,
-            "tags": tags_list,
-            "collections": collections_list,
-            "collection_summaries": collection_summaries,
+            "tags": sidebar.tags,
+            "collections": sidebar.collections,
+            "collection_summaries": sidebar.collection_summaries,
             "top_collection_summaries": top_collection_summaries,
             "search": search,
             "filter_tag": tag,
@@ -278,7 +326,7 @@ def list_links_view(
             "date_from": date_from,
             "date_to": date_to,
             "show_broken": broken,
-            "has_any_broken_links": any_broken_links,
+            "has_any_broken_links": sidebar.has_broken_links,
             "success_message": "Link updated successfully!" if updated else None,
         },
     )
@@ -293,30 +341,28 @@ def update_link_view(
     notes: str | None = Form(default=None),
     tags: str | None = Form(default=None),
     collection: str | None = Form(default=None),
+    *,
+    session: SessionDep,
 ):
     title = title.strip() if title is not None else None
     notes = notes.strip() if notes is not None else None
     collection = collection.strip() if collection is not None else None
 
-    session = _get_session()
-    try:
-        link = get_link(session, link_id)
-        if not link:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Link not found")
-        tags_list = [tag.strip() for tag in (tags or "").split(",") if tag.strip()]
-        payload = LinkUpdate(
-            title=title if title is not None else link.title,
-            notes=notes if notes is not None else link.notes,
-            tags=tags_list if tags is not None else None,
-            collection=collection if collection else None,
-        )
-        updated_link = update_link(session, link, payload)
-        session.commit()
+    link = get_link(session, link_id)
+    if not link:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Link not found")
+    tags_list = [tag.strip() for tag in (tags or "").split(",") if tag.strip()]
+    payload = LinkUpdate(
+        title=title if title is not None else link.title,
+        notes=notes if notes is not None else link.notes,
+        tags=tags_list if tags is not None else None,
+        collection=collection if collection else None,
+    )
+    updated_link = update_link(session, link, payload)
+    session.commit()
 
-        if needs_title_refresh(updated_link):
-            background_tasks.add_task(refresh_link_title_if_placeholder, updated_link.id)
-    finally:
-        session.close()
+    if needs_title_refresh(updated_link):
+        schedule_metadata_refresh(background_tasks, updated_link.id, title_only=True)
     referer = request.headers.get("referer") or "/links"
     separator = "&" if "?" in referer else "?"
     redirect_url = f"{referer}{separator}updated=1"
@@ -327,30 +373,25 @@ async def add_link_post(
     background_tasks: BackgroundTasks,
     url: str = Form(...),
     title: str = Form(""),
-    db: Session = Depends(get_db)
+    *,
+    session: SessionDep,
 ):
     payload = LinkCreate(url=url, title=title or None)
-    link = create_link(db, payload)
-    db.commit()
+    link = create_link(session, payload)
+    session.commit()
 
-    if needs_title_refresh(link):
-        background_tasks.add_task(refresh_link_title_if_placeholder, link.id)
+    if needs_metadata_refresh(link):
+        schedule_metadata_refresh(background_tasks, link.id)
 
     return RedirectResponse(url="/links", status_code=303)
 
 
 
 @router.post("/links/{link_id}/delete")
-def delete_link_view(request: Request, link_id: int):
-    session = _get_session()
-    try:
-        link = get_link(session, link_id)
-        if not link:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Link not found")
-        delete_link(session, link)
-        session.commit()
-    finally:
-        session.close()
+def delete_link_view(request: Request, link_id: int, *, session: SessionDep):
+    if not delete_link_by_id(session, link_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Link not found")
+    session.commit()
     referer = request.headers.get("referer") or ""
     if f"/links/{link_id}" in referer:
         redirect_url = "/links?deleted=1"
@@ -366,41 +407,39 @@ def add_page(
     title: str | None = Query(None),
     notes: str | None = Query(None),
     bulk_success: str | None = Query(None),
-    bulk_error: str | None = Query(None)
+    bulk_error: str | None = Query(None),
+    *,
+    session: SessionDep,
 ):
     recommended_tags: list[dict[str, str | None]] = []
     available_tags: list[dict[str, str | None]] = []
-    session = _get_session()
-    try:
-        recommended_tag_entities = get_default_tags(session, limit=5)
-        recommended_tags = [
-            {
-                "name": tag.name,
-                "slug": tag.slug,
-                "icon": tag.icon,
-                "color": tag.color,
-            }
-            for tag in recommended_tag_entities
-            if tag.slug
-        ]
-        
-        # Get all available tags for autocomplete
-        all_tags = list_all_tags(session)
-        available_tags = [
-            {
-                "name": tag.name,
-                "slug": tag.slug,
-                "icon": tag.icon,
-                "color": tag.color,
-            }
-            for tag in all_tags
-            if tag.slug
-        ]
-        available_tags.sort(key=lambda item: item["name"].lower())
-    finally:
-        session.close()
-    return templates.TemplateResponse(
-        "add.html",
+    recommended_tag_entities = get_default_tags(session, limit=5)
+    recommended_tags = [
+        {
+            "name": tag.name,
+            "slug": tag.slug,
+            "icon": tag.icon,
+            "color": tag.color,
+        }
+        for tag in recommended_tag_entities
+        if tag.slug
+    ]
+    
+    # Get all available tags for autocomplete
+    all_tags = list_all_tags(session)
+    available_tags = [
+        {
+            "name": tag.name,
+            "slug": tag.slug,
+            "icon": tag.icon,
+            "color": tag.color,
+        }
+        for tag in all_tags
+        if tag.slug
+    ]
+    available_tags.sort(key=lambda item: item["name"].lower())
+    return render_page(
+        ADD_TEMPLATE,
         {
             "request": request,
             "prefill": {
@@ -416,18 +455,22 @@ def add_page(
 
 
 @router.post("/bulk-import")
-def bulk_import_links(request: Request, urls: str = Form(...)):
+def bulk_import_links(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    urls: str = Form(...),
+    *,
+    session: SessionDep,
+):
     """Import multiple links from a textarea input"""
-    from ..crud import create_link, get_link_by_url
-    
     lines = urls.strip().split('\n')
     imported_count = 0
     skipped_count = 0
     duplicate_count = 0
     errors = []
     
-    session = _get_session()
     try:
+        entries = []
         for line in lines:
             line = line.strip()
             if not line:
@@ -449,26 +492,31 @@ def bulk_import_links(request: Request, urls: str = Form(...)):
                 skipped_count += 1
                 errors.append(f"Invalid URL: {line[:50]}")
                 continue
-            
-            # Check for duplicate
-            existing_link = get_link_by_url(session, url)
-            if existing_link:
+            entries.append((url, title))
+
+        # One lookup finds every already-saved URL; repeats within the paste are caught as we go
+        seen_urls = find_existing_normalized_urls(session, (url for url, _ in entries))
+        payloads = []
+        for url, title in entries:
+            normalized = normalize_url(url)
+            if normalized in seen_urls:
                 duplicate_count += 1
                 errors.append(f"Duplicate: {url[:50]} (already exists)")
                 continue
-            
+            seen_urls.add(normalized)
+
             try:
-                link_data = LinkCreate(
-                    url=url,
-                    title=title or url,
-                )
-                create_link(session, link_data)
-                imported_count += 1
+                payloads.append(LinkCreate(url=url, title=title or url))
             except Exception as e:
                 skipped_count += 1
                 errors.append(f"Error importing {url[:50]}: {str(e)}")
-        
+
+        links = create_links(session, payloads)
+        imported_count = len(links)
         session.commit()
+        for link in links:
+            if needs_metadata_refresh(link):
+                schedule_metadata_refresh(background_tasks, link.id)
         
         # Build success/error messages
         if imported_count > 0:
@@ -499,28 +547,30 @@ def bulk_import_links(request: Request, urls: str = Form(...)):
             url=f"/add?bulk_error=Error during import: {str(e)}#bulk",
             status_code=status.HTTP_303_SEE_OTHER
         )
-    finally:
-        session.close()
 
 
 @router.post("/bulk-import-csv")
-async def bulk_import_csv(request: Request, file: UploadFile):
+def bulk_import_csv(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    file: UploadFile,
+    *,
+    session: SessionDep,
+):
     """Import multiple links from a CSV file"""
-    import csv
-    import io
-
-    from ..crud import create_link
-    
     imported_count = 0
     skipped_count = 0
     errors = []
-    
-    session = _get_session()
+    refresh_ids = []
+
+    def import_batch(payloads: list[LinkCreate]) -> int:
+        links = create_links(session, payloads)
+        refresh_ids.extend(link.id for link in links if needs_metadata_refresh(link))
+        return len(links)
+
     try:
-        # Read CSV file
-        content = await file.read()
-        decoded_content = content.decode('utf-8')
-        csv_reader = csv.DictReader(io.StringIO(decoded_content))
+        # Decode the spooled upload row by row instead of reading it into memory
+        csv_reader = csv.DictReader(codecs.iterdecode(file.file, 'utf-8'))
         
         # Check for required column
         if 'url' not in csv_reader.fieldnames:
@@ -529,6 +579,7 @@ async def bulk_import_csv(request: Request, file: UploadFile):
                 status_code=status.HTTP_303_SEE_OTHER
             )
         
+        payloads = []
         for row in csv_reader:
             url = row.get('url', '').strip()
             if not url:
@@ -550,19 +601,27 @@ async def bulk_import_csv(request: Request, file: UploadFile):
                 # Split by comma when tags are provided, otherwise leave empty
                 tags = [t.strip() for t in tags_str.split(',') if t.strip()] if tags_str else []
 
-                link_data = LinkCreate(
-                    url=url,
-                    title=title,
-                    notes=notes,
-                    tags=tags,
+                payloads.append(
+                    LinkCreate(
+                        url=url,
+                        title=title,
+                        notes=notes,
+                        tags=tags,
+                    )
                 )
-                create_link(session, link_data)
-                imported_count += 1
             except Exception as e:
                 skipped_count += 1
                 errors.append(f"Error importing {url[:50]}: {str(e)}")
-        
+                continue
+
+            if len(payloads) >= CSV_IMPORT_BATCH_SIZE:
+                imported_count += import_batch(payloads)
+                payloads = []
+
+        imported_count += import_batch(payloads)
         session.commit()
+        for link_id in refresh_ids:
+            schedule_metadata_refresh(background_tasks, link_id)
         
         # Build success/error messages
         if imported_count > 0:
@@ -587,8 +646,6 @@ async def bulk_import_csv(request: Request, file: UploadFile):
             url=f"/add?bulk_error=Error processing CSV: {str(e)}#bulk",
             status_code=status.HTTP_303_SEE_OTHER
         )
-    finally:
-        session.close()
 
 
 @router.get("/settings")
@@ -596,34 +653,30 @@ def settings_page(
     request: Request,
     success: str | None = Query(None),
     error: str | None = Query(None),
+    *,
+    session: SessionDep,
 ):
-    from ..icons import COLOR_OPTIONS, ICON_LIBRARY
+    tags_with_counts = list_tags_with_counts(session)
+    collections_with_counts = list_collections_with_counts(session)
 
-    session = _get_session()
-    try:
-        tags_with_counts = list_tags_with_counts(session)
-        collections_with_counts = list_collections_with_counts(session)
-
-        # Convert to list of dicts with link_count, icon, and color attributes
-        tags = [
-            {
-                "id": tag.id,
-                "name": tag.name,
-                "icon": tag.icon,
-                "color": tag.color,
-                "link_count": count,
-            }
-            for tag, count in tags_with_counts
-        ]
-        collections = [
-            {"id": coll.id, "name": coll.name, "link_count": count}
-            for coll, count in collections_with_counts
-        ]
-    finally:
-        session.close()
+    # Convert to list of dicts with link_count, icon, and color attributes
+    tags = [
+        {
+            "id": tag.id,
+            "name": tag.name,
+            "icon": tag.icon,
+            "color": tag.color,
+            "link_count": count,
+        }
+        for tag, count in tags_with_counts
+    ]
+    collections = [
+        {"id": coll.id, "name": coll.name, "link_count": count}
+        for coll, count in collections_with_counts
+    ]
     
-    return templates.TemplateResponse(
-        "settings.html",
+    return render_page(
+        SETTINGS_TEMPLATE,
         {
             "request": request,
             "tags": tags,
@@ -638,8 +691,7 @@ def settings_page(
 
 # Tag management routes
 @router.post("/settings/tags/create")
-def create_tag_route(request: Request, name: str = Form(...)):
-    session = _get_session()
+def create_tag_route(request: Request, name: str = Form(...), *, session: SessionDep):
     try:
         create_tag(session, name)
         session.commit()
@@ -647,8 +699,6 @@ def create_tag_route(request: Request, name: str = Form(...)):
     except ValueError as e:
         session.rollback()
         return RedirectResponse(url=f"/settings?error={str(e)}", status_code=status.HTTP_303_SEE_OTHER)
-    finally:
-        session.close()
 
 
 @router.post("/settings/tags/{tag_id}/update")
@@ -658,8 +708,9 @@ def update_tag_route(
     name: str = Form(...),
     icon: str | None = Form(None),
     color: str | None = Form(None),
+    *,
+    session: SessionDep,
 ):
-    session = _get_session()
     try:
         tag = get_tag(session, tag_id)
         if not tag:
@@ -670,28 +721,21 @@ def update_tag_route(
     except ValueError as e:
         session.rollback()
         return RedirectResponse(url=f"/settings?error={str(e)}", status_code=status.HTTP_303_SEE_OTHER)
-    finally:
-        session.close()
 
 
 @router.post("/settings/tags/{tag_id}/delete")
-def delete_tag_route(request: Request, tag_id: int):
-    session = _get_session()
-    try:
-        tag = get_tag(session, tag_id)
-        if not tag:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tag not found")
-        delete_tag(session, tag)
-        session.commit()
-        return RedirectResponse(url="/settings?success=Tag+deleted+successfully", status_code=status.HTTP_303_SEE_OTHER)
-    finally:
-        session.close()
+def delete_tag_route(request: Request, tag_id: int, *, session: SessionDep):
+    tag = get_tag(session, tag_id)
+    if not tag:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tag not found")
+    delete_tag(session, tag)
+    session.commit()
+    return RedirectResponse(url="/settings?success=Tag+deleted+successfully", status_code=status.HTTP_303_SEE_OTHER)
 
 
 # Collection management routes
 @router.post("/settings/collections/create")
-def create_collection_route(request: Request, name: str = Form(...)):
-    session = _get_session()
+def create_collection_route(request: Request, name: str = Form(...), *, session: SessionDep):
     try:
         create_collection(session, name)
         session.commit()
@@ -699,13 +743,16 @@ def create_collection_route(request: Request, name: str = Form(...)):
     except ValueError as e:
         session.rollback()
         return RedirectResponse(url=f"/settings?error={str(e)}#collections", status_code=status.HTTP_303_SEE_OTHER)
-    finally:
-        session.close()
 
 
 @router.post("/settings/collections/{collection_id}/update")
-def update_collection_route(request: Request, collection_id: int, name: str = Form(...)):
-    session = _get_session()
+def update_collection_route(
+    request: Request,
+    collection_id: int,
+    name: str = Form(...),
+    *,
+    session: SessionDep,
+):
     try:
         collection = get_collection(session, collection_id)
         if not collection:
@@ -716,22 +763,16 @@ def update_collection_route(request: Request, collection_id: int, name: str = Fo
     except ValueError as e:
         session.rollback()
         return RedirectResponse(url=f"/settings?error={str(e)}#collections", status_code=status.HTTP_303_SEE_OTHER)
-    finally:
-        session.close()
 
 
 @router.post("/settings/collections/{collection_id}/delete")
-def delete_collection_route(request: Request, collection_id: int):
-    session = _get_session()
-    try:
-        collection = get_collection(session, collection_id)
-        if not collection:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Collection not found")
-        delete_collection(session, collection)
-        session.commit()
-        return RedirectResponse(url="/settings?success=Collection+deleted+successfully#collections", status_code=status.HTTP_303_SEE_OTHER)
-    finally:
-        session.close()
+def delete_collection_route(request: Request, collection_id: int, *, session: SessionDep):
+    collection = get_collection(session, collection_id)
+    if not collection:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Collection not found")
+    delete_collection(session, collection)
+    session.commit()
+    return RedirectResponse(url="/settings?success=Collection+deleted+successfully#collections", status_code=status.HTTP_303_SEE_OTHER)
 
 
 # ============================================================================
@@ -741,40 +782,36 @@ def delete_collection_route(request: Request, collection_id: int):
 
 
 @router.get("/notes/{note_id}")
-def note_detail_page(request: Request, note_id: int, updated: bool = False):
+def note_detail_page(request: Request, note_id: int, updated: bool = False, *, session: SessionDep):
     """Note detail/edit page"""
-    session = _get_session()
-    try:
-        note = get_note(session, note_id)
-        if not note:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found")
+    note = get_note(session, note_id)
+    if not note:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found")
 
-        all_collections = list_all_collections(session)
-        available_tag_entities = list_all_tags(session)
-        available_tags = [
-            {
-                "name": tag.name,
-                "slug": tag.slug,
-                "icon": tag.icon,
-                "color": tag.color,
-            }
-            for tag in available_tag_entities
-            if tag.name
-        ]
-        available_tags.sort(key=lambda item: item["name"].lower())
-
-        return templates.TemplateResponse(
-            "note_detail.html",
-            {
-                "request": request,
-                "note": note,
-                "updated": updated,
-                "collections": all_collections,
-                "available_tags": available_tags,
-            },
-        )
-    finally:
-        session.close()
+    all_collections = list_all_collections(session)
+    available_tag_entities = list_all_tags(session)
+    available_tags = [
+        {
+            "name": tag.name,
+            "slug": tag.slug,
+            "icon": tag.icon,
+            "color": tag.color,
+        }
+        for tag in available_tag_entities
+        if tag.name
+    ]
+    available_tags.sort(key=lambda item: item["name"].lower())
+
+    return render_page(
+        NOTE_DETAIL_TEMPLATE,
+        {
+            "request": request,
+            "note": note,
+            "updated": updated,
+            "collections": all_collections,
+            "available_tags": available_tags,
+        },
+    )
 
 
 @router.post("/notes/create")
@@ -785,9 +822,10 @@ async def create_note_route(
     tags: str = Form(""),
     collection: str = Form(""),
     image: UploadFile | None = File(None),
+    *,
+    session: SessionDep,
 ):
     """Create a new note"""
-    session = _get_session()
     try:
         # Parse tags from comma-separated string
         tag_list = [t.strip() for t in tags.split(",") if t.strip()]
@@ -798,7 +836,10 @@ async def create_note_route(
             try:
                 image_data = await image.read()
                 if validate_image(image_data):
-                    image_url = compress_image(image_data, max_size_kb=100)
+                    compressed, content_type = await compress_image_async(
+                        image_data, max_size_kb=100
+                    )
+                    image_url = note_image_url(create_note_image(session, compressed, content_type))
             except Exception as e:
                 return RedirectResponse(
                     url=f"/add?error=Failed+to+process+image:+{str(e)}",
@@ -826,8 +867,6 @@ async def create_note_route(
             url=f"/add?error={str(e)}",
             status_code=status.HTTP_303_SEE_OTHER,
         )
-    finally:
-        session.close()
 
 
 @router.post("/notes/{note_id}/update")
@@ -840,9 +879,10 @@ async def update_note_route(
     collection: str = Form(""),
     image: UploadFile | None = File(None),
     remove_image: bool = Form(False),
+    *,
+    session: SessionDep,
 ):
     """Update an existing note"""
-    session = _get_session()
     try:
         note = get_note(session, note_id)
         if not note:
@@ -859,7 +899,10 @@ async def update_note_route(
             try:
                 image_data = await image.read()
                 if validate_image(image_data):
-                    image_url = compress_image(image_data, max_size_kb=100)
+                    compressed, content_type = await compress_image_async(
+                        image_data, max_size_kb=100
+                    )
+                    image_url = note_image_url(create_note_image(session, compressed, content_type))
             except Exception as e:
                 return RedirectResponse(
                     url=f"/notes/{note_id}?error=Failed+to+process+image:+{str(e)}",
@@ -887,25 +930,16 @@ async def update_note_route(
             url=f"/notes/{note_id}?error={str(e)}",
             status_code=status.HTTP_303_SEE_OTHER,
         )
-    finally:
-        session.close()
 
 
 @router.post("/notes/{note_id}/delete")
-def delete_note_route(request: Request, note_id: int):
+def delete_note_route(request: Request, note_id: int, *, session: SessionDep):
     """Delete a note"""
-    session = _get_session()
-    try:
-        note = get_note(session, note_id)
-        if not note:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found")
-
-        delete_note(session, note)
-        session.commit()
+    if not delete_note_by_id(session, note_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found")
+    session.commit()
 
-        return RedirectResponse(
-            url="/links?success=Note+deleted+successfully",
-            status_code=status.HTTP_303_SEE_OTHER,
-        )
-    finally:
-        session.close()
+    return RedirectResponse(
+        url="/links?success=Note+deleted+successfully",
+        status_code=status.HTTP_303_SEE_OTHER,
+    )
@@ -117,9 +117,13 @@ class LinkRead(BaseModel):
 
 class PaginatedLinks(BaseModel):
     items: list[LinkRead]
-    total: int
+    # Not counted for pages read by cursor
+    total: int | None
     page: int
     page_size: int
+    has_more: bool = False
+    # Pass back as ``cursor`` to fetch the following page without an OFFSET scan
+    next_cursor: str | None = None
 
 
 # Note schemas
@@ -174,6 +178,10 @@ class NoteRead(NoteBase):
 
 class PaginatedNotes(BaseModel):
     items: list[NoteRead]
-    total: int
+    # Not counted for pages read by cursor
+    total: int | None
     page: int
     page_size: int
+    has_more: bool = False
+    # Pass back as ``cursor`` to fetch the following page without an OFFSET scan
+    next_cursor: str | None = None
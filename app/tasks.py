@@ -1,13 +1,27 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Callable, Sequence
+from contextlib import suppress
+from datetime import datetime
 from typing import Any
 
-from sqlalchemy.orm import Session
+from fastapi import BackgroundTasks
+from sqlalchemy import select
+from sqlalchemy.orm import Session, lazyload
 
 from .crud import get_link
 from .database import SessionLocal
 from .link_preview import fetch_link_metadata
+from .models import Link
+
+# Most links the refresh worker fetches concurrently and saves in one commit
+REFRESH_BATCH_SIZE = 16
+
+# (link id, title only) pairs drained by the worker that the app lifespan starts on its loop
+_refresh_queue: asyncio.Queue[tuple[int, bool]] | None = None
+_refresh_loop: asyncio.AbstractEventLoop | None = None
+_refresh_worker: asyncio.Task[None] | None = None
 
 
 def _normalize_value(value: str | None) -> str:
@@ -33,7 +47,16 @@ def needs_title_refresh(link: Any) -> bool:
     return title == url
 
 
-def _fetch_title_sync(url: str) -> str:
+def needs_metadata_refresh(link: Any) -> bool:
+    """Return True when the link is missing a real title, a preview image or notes."""
+    return (
+        needs_title_refresh(link)
+        or not _normalize_value(getattr(link, "image_url", None))
+        or not _normalize_value(getattr(link, "notes", None))
+    )
+
+
+def _fetch_metadata_sync(url: str) -> dict[str, Any]:
     try:
         metadata = asyncio.run(fetch_link_metadata(url))
     except RuntimeError:
@@ -46,8 +69,11 @@ def _fetch_title_sync(url: str) -> str:
             loop.close()
             asyncio.set_event_loop(None)
 
-    if not metadata:
-        return ""
+    return metadata or {}
+
+
+def _fetch_title_sync(url: str) -> str:
+    metadata = _fetch_metadata_sync(url)
     return _normalize_value(_coerce_to_str(metadata.get("title")))
 
 
@@ -68,3 +94,136 @@ def refresh_link_title_if_placeholder(link_id: int) -> None:
         session.commit()
     finally:
         session.close()
+
+
+def _apply_metadata(link: Link, metadata: dict[str, Any], *, title_only: bool = False) -> bool:
+    """Fill in a placeholder title and, unless ``title_only``, a missing image and notes."""
+    changed = False
+    if needs_title_refresh(link):
+        new_title = _normalize_value(_coerce_to_str(metadata.get("title")))
+        if new_title and new_title != link.title:
+            link.title = new_title
+            changed = True
+    if title_only:
+        return changed
+    if not _normalize_value(link.image_url) and metadata.get("image"):
+        link.image_url = _coerce_to_str(metadata["image"])
+        link.image_check_status = "success"
+        link.image_checked_at = datetime.now()
+        changed = True
+    if not _normalize_value(link.notes) and metadata.get("description"):
+        link.notes = _coerce_to_str(metadata["description"])
+        changed = True
+    return changed
+
+
+def refresh_link_metadata(link_id: int) -> None:
+    """Fetch metadata once and fill in whichever of title, image and notes the link lacks."""
+    session: Session = SessionLocal()
+    try:
+        link = get_link(session, link_id)
+        if not link or not needs_metadata_refresh(link):
+            return
+
+        try:
+            metadata = _fetch_metadata_sync(link.url)
+        except Exception:
+            # If fetching fails, keep the link as it was saved
+            return
+
+        if _apply_metadata(link, metadata):
+            session.add(link)
+            session.commit()
+    finally:
+        session.close()
+
+
+def _urls_needing_refresh(
+    link_ids: Sequence[int], needs_refresh: Callable[[Any], bool]
+) -> dict[int, str]:
+    with SessionLocal() as session:
+        rows = session.execute(
+            select(Link.id, Link.url, Link.title, Link.image_url, Link.notes).where(
+                Link.id.in_(link_ids)
+            )
+        )
+        return {row.id: row.url for row in rows if needs_refresh(row)}
+
+
+def _save_fetched_metadata(fetched: dict[int, dict[str, Any]], title_only: bool) -> None:
+    with SessionLocal() as session:
+        links = session.execute(
+            select(Link).where(Link.id.in_(fetched)).options(lazyload(Link.tags))
+        ).scalars()
+        # Re-checked against the current rows, so edits made while fetching are kept
+        changed = [_apply_metadata(link, fetched[link.id], title_only=title_only) for link in links]
+        if any(changed):
+            session.commit()
+
+
+async def refresh_links_metadata(link_ids: Sequence[int], *, title_only: bool = False) -> None:
+    """Fetch metadata for several links concurrently and save what they lack in one commit."""
+    needs_refresh = needs_title_refresh if title_only else needs_metadata_refresh
+    urls = await asyncio.to_thread(_urls_needing_refresh, link_ids, needs_refresh)
+    if not urls:
+        return
+    results = await asyncio.gather(
+        *(fetch_link_metadata(url) for url in urls.values()), return_exceptions=True
+    )
+    # Links whose fetch failed are kept as they were saved
+    fetched = {
+        link_id: metadata
+        for link_id, metadata in zip(urls, results, strict=True)
+        if isinstance(metadata, dict)
+    }
+    if fetched:
+        await asyncio.to_thread(_save_fetched_metadata, fetched, title_only)
+
+
+async def _drain_refresh_queue(queue: asyncio.Queue[tuple[int, bool]]) -> None:
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < REFRESH_BATCH_SIZE and not queue.empty():
+            batch.append(queue.get_nowait())
+        try:
+            for title_only in (False, True):
+                link_ids = list(dict.fromkeys(i for i, only in batch if only is title_only))
+                if link_ids:
+                    await refresh_links_metadata(link_ids, title_only=title_only)
+        except Exception as e:
+            print(f"Error refreshing link metadata: {e}")
+        finally:
+            for _ in batch:
+                queue.task_done()
+
+
+async def start_refresh_worker() -> None:
+    """Start draining scheduled metadata refreshes on the running event loop."""
+    global _refresh_queue, _refresh_loop, _refresh_worker
+    _refresh_queue = asyncio.Queue()
+    _refresh_loop = asyncio.get_running_loop()
+    _refresh_worker = asyncio.create_task(_drain_refresh_queue(_refresh_queue))
+
+
+async def stop_refresh_worker() -> None:
+    """Stop the refresh worker; refreshes still queued are dropped with it."""
+    global _refresh_queue, _refresh_loop, _refresh_worker
+    worker = _refresh_worker
+    _refresh_queue = _refresh_loop = _refresh_worker = None
+    if worker is not None:
+        worker.cancel()
+        with suppress(asyncio.CancelledError):
+            await worker
+
+
+def schedule_metadata_refresh(
+    background_tasks: BackgroundTasks, link_id: int, *, title_only: bool = False
+) -> None:
+    """Queue a link for the refresh worker, or for ``background_tasks`` when none is running."""
+    loop, queue = _refresh_loop, _refresh_queue
+    if loop is not None and queue is not None and not loop.is_closed():
+        # Sync routes run in worker threads, so the queue is only touched from its own loop
+        loop.call_soon_threadsafe(queue.put_nowait, (link_id, title_only))
+        return
+    task = refresh_link_title_if_placeholder if title_only else refresh_link_metadata
+    background_tasks.add_task(task, link_id)
@@ -8,15 +8,20 @@ import httpx
 from bs4 import BeautifulSoup
 
 from .config import get_settings
-from .crud import create_link, create_note, get_link_by_url
+from .crud import create_link, create_note, create_note_image, get_link_by_url, note_image_url
 from .database import SessionLocal
-from .image_utils import compress_image, validate_image
+from .image_utils import compress_image_async, validate_image
 from .schemas import LinkCreate, NoteCreate
+from .tasks import needs_metadata_refresh, refresh_links_metadata
 
 settings = get_settings()
 TELEGRAM_BOT_TOKEN = settings.telegram_bot_token
 TELEGRAM_API_URL = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}" if TELEGRAM_BOT_TOKEN else None
 
+# Attribute filters for the metadata scrape, built once instead of on every message
+_OG_TITLE_ATTRS = {"property": "og:title"}
+_OG_IMAGE_ATTRS = {"property": "og:image"}
+
 # Store the last update_id we processed
 last_update_id = 0
 
@@ -72,7 +77,7 @@ async def fetch_url_metadata(url: str) -> dict[str, Any]:
             title = None
 
             # Try Open Graph title
-            og_title = soup.find("meta", property="og:title")
+            og_title = soup.find("meta", attrs=_OG_TITLE_ATTRS)
             if og_title and og_title.get("content"):
                 content = og_title["content"]
                 # Sanitize: limit length and strip dangerous chars
@@ -92,7 +97,7 @@ async def fetch_url_metadata(url: str) -> dict[str, Any]:
 
             # Try to get image
             image = None
-            og_image = soup.find("meta", property="og:image")
+            og_image = soup.find("meta", attrs=_OG_IMAGE_ATTRS)
             if og_image and og_image.get("content"):
                 content = og_image["content"]
                 if isinstance(content, str):
@@ -254,6 +259,7 @@ async def process_message(message: dict[str, Any]) -> None:
     duplicate_count = 0
     saved_links = []
     duplicate_links = []
+    refresh_link_ids = []
 
     try:
         for url in valid_urls:
@@ -305,7 +311,9 @@ async def process_message(message: dict[str, Any]) -> None:
             )
 
             # Create link in database
-            create_link(session=session, payload=link_payload)
+            link = create_link(session=session, payload=link_payload)
+            if needs_metadata_refresh(link):
+                refresh_link_ids.append(link.id)
             saved_count += 1
             saved_links.append({
                 "url": url,
@@ -369,6 +377,10 @@ async def process_message(message: dict[str, Any]) -> None:
 
         await send_telegram_message(chat_id, response_text)
 
+        # Fill in missing notes and images after replying so the user is not kept waiting
+        if refresh_link_ids:
+            await refresh_links_metadata(refresh_link_ids)
+
     except Exception as e:
         session.rollback()
         print(f"Error saving link: {e}")
@@ -394,11 +406,12 @@ async def process_message(message: dict[str, Any]) -> None:
             img_resp = await client.get(file_url)
             img_resp.raise_for_status()
             image_data = img_resp.content
-        # Compress and encode image
-        image_url = compress_image(image_data, max_size_kb=100)
+        # Compress image
+        compressed, content_type = await compress_image_async(image_data, max_size_kb=100)
         # Save note with image
         session = SessionLocal()
         try:
+            image_url = note_image_url(create_note_image(session, compressed, content_type))
             note_payload = NoteCreate(
                 title="FromTelegram",
                 content="FromTelegram",
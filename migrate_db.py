@@ -1,7 +1,9 @@
-"""Create/update database tables"""
+"""Create/update database tables and apply the versioned SQLite migrations"""
 from app.database import Base, engine
+from app.migrations import run_migrations
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
-print("✓ Database tables created/updated successfully!")
-
+if __name__ == "__main__":
+    # New tables first, so the migrations can alter and backfill the ones that already existed
+    Base.metadata.create_all(bind=engine)
+    run_migrations()
+    print("✓ Database tables created/updated successfully!")
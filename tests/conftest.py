@@ -0,0 +1,41 @@
+import os
+import tempfile
+
+import pytest
+
+tmp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp_db.name}")
+
+from app.config import reload_settings  # noqa: E402
+
+reload_settings()
+
+from app.crud import invalidate_listing_caches, invalidate_tag_caches  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+
+
+@pytest.fixture
+def db_session():
+    """Provide a session bound to a freshly created schema."""
+
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+        # Cached rows would otherwise outlive the schema they were read from
+        invalidate_listing_caches()
+        invalidate_tag_caches()
+
+
+def pytest_sessionfinish(session, exitstatus):  # noqa: D401
+    """Cleanup the temp database file."""
+
+    engine.dispose()
+    try:
+        tmp_db.close()
+        os.unlink(tmp_db.name)
+    except OSError:
+        pass
@@ -1,5 +1,7 @@
+import json
 import os
 import tempfile
+from urllib.parse import unquote
 
 from fastapi.testclient import TestClient
 
@@ -12,6 +14,7 @@ get_settings.cache_clear()
 
 from app.database import Base, engine  # noqa: E402
 from app.main import create_app  # noqa: E402
+from app.routers import web  # noqa: E402
 
 app = create_app()
 client = TestClient(app)
@@ -57,3 +60,122 @@ def test_create_and_list_link():
     assert list_response.status_code == 200
     items = list_response.json()["items"]
     assert any(item["url"].rstrip("/") == payload["url"].rstrip("/") for item in items)
+
+
+def test_export_links_streams_json_array():
+    client.post("/api/links", json={"url": "https://example.org/export", "title": "Export"})
+
+    response = client.get("/api/links/export")
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/json"
+    items = response.json()
+    assert isinstance(items, list)
+    assert any(item["title"] == "Export" for item in items)
+
+
+def test_tag_listing_cache_refreshes_after_commit():
+    client.get("/api/tags")
+
+    client.post("/api/links", json={"url": "https://example.net/cached", "tags": ["fresh-tag"]})
+
+    slugs = {tag["slug"] for tag in client.get("/api/tags").json()}
+    assert "fresh-tag" in slugs
+
+
+def test_list_notes_cursor_walks_every_note_once():
+    created = {
+        client.post("/api/notes", json={"title": f"Cursor {i}", "content": "c"}).json()["id"]
+        for i in range(5)
+    }
+
+    seen = []
+    response = client.get("/api/notes", params={"page_size": 2}).json()
+    seen.extend(item["id"] for item in response["items"])
+    while response["next_cursor"]:
+        response = client.get(
+            "/api/notes", params={"page_size": 2, "cursor": response["next_cursor"]}
+        ).json()
+        seen.extend(item["id"] for item in response["items"])
+        assert response["total"] is None
+
+    assert response["has_more"] is False
+    assert len(seen) == len(set(seen))
+    assert created <= set(seen)
+    assert client.get("/api/notes", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_export_links_streams_ndjson():
+    client.post("/api/links", json={"url": "https://example.org/ndjson", "title": "Lines"})
+
+    response = client.get("/api/links/export", params={"format": "ndjson"})
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert any(item["title"] == "Lines" for item in lines)
+
+
+def test_get_link_honours_if_none_match():
+    created = client.post("/api/links", json={"url": "https://example.org/etag", "title": "E"})
+    link_id = created.json()["id"]
+
+    first = client.get(f"/api/links/{link_id}")
+    etag = first.headers["etag"]
+    cached = client.get(f"/api/links/{link_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    client.patch(f"/api/links/{link_id}", json={"tags": ["etag-tag"]})
+    changed = client.get(f"/api/links/{link_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["tags"][0]["slug"] == "etag-tag"
+
+
+def test_links_page_renders_sidebar_collections():
+    client.post("/api/links", json={"url": "https://example.org/page", "collection": "Reading"})
+
+    response = client.get("/links")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/html")
+    assert "Reading" in response.text
+
+
+def test_bulk_import_skips_saved_and_repeated_urls():
+    client.post("/api/links", json={"url": "https://example.org/bulk-saved"})
+    urls = "\n".join(
+        [
+            "https://example.org/bulk-saved?utm_source=feed",
+            "https://example.org/bulk-new | Fresh",
+            "https://example.org/bulk-new",
+            "not a url",
+        ]
+    )
+
+    response = client.post("/bulk-import", data={"urls": urls}, follow_redirects=False)
+    assert response.status_code == 303
+    location = unquote(response.headers["location"])
+    assert "imported 1 link" in location
+    assert "2 duplicate(s)" in location
+    assert "1 invalid" in location
+
+    titles = [item["title"] for item in client.get("/api/links").json()["items"]]
+    assert titles.count("Fresh") == 1
+
+
+def test_bulk_import_csv_streams_rows_in_batches(monkeypatch):
+    monkeypatch.setattr(web, "CSV_IMPORT_BATCH_SIZE", 2)
+    rows = ["url,title,tags"]
+    rows += [f"https://example.org/csv-{i},CSV {i},csv-import" for i in range(5)]
+    upload = ("\n".join(rows) + "\nftp://example.org/skip,Skip,\n").encode()
+
+    response = client.post(
+        "/bulk-import-csv",
+        files={"file": ("links.csv", upload, "text/csv")},
+        follow_redirects=False,
+    )
+    assert response.status_code == 303
+    location = unquote(response.headers["location"])
+    assert "imported 5 link(s)" in location
+    assert "1 link(s) were skipped" in location
+
+    imported = client.get("/api/links", params={"tag": "csv-import"}).json()
+    assert imported["total"] == 5
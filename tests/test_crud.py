@@ -0,0 +1,284 @@
+"""Tests for tag and collection helpers in the CRUD layer."""
+
+from datetime import date, datetime
+
+from sqlalchemy import inspect
+
+from app.crud import (
+    create_link,
+    create_links,
+    create_note,
+    create_note_image,
+    delete_collection,
+    delete_note,
+    delete_note_by_id,
+    ensure_default_tags,
+    get_default_tags,
+    get_link,
+    get_note_image,
+    get_or_create_collection,
+    get_or_create_tags,
+    get_tag,
+    list_all_collections,
+    list_links,
+    list_notes,
+    load_links_sidebar,
+    note_image_url,
+    parse_date_param,
+    update_note,
+    update_tag,
+)
+from app.database import SessionLocal
+from app.schemas import LinkCreate, NoteCreate, NoteUpdate
+
+
+def test_get_or_create_tags_reuses_existing(db_session):
+    """Test that existing tags are returned instead of duplicated."""
+    first = get_or_create_tags(db_session, ["python", "web"])
+    second = get_or_create_tags(db_session, ["Python", "news"])
+
+    assert {tag.name for tag in first} == {"python", "web"}
+    assert {tag.name for tag in second} == {"python", "news"}
+    python_tags = [tag for tag in first + second if tag.name == "python"]
+    assert len({tag.id for tag in python_tags}) == 1
+    assert all(tag.slug for tag in second)
+
+
+def test_get_or_create_collection_is_case_insensitive(db_session):
+    """Test that collections are matched regardless of case."""
+    created = get_or_create_collection(db_session, "Reading List")
+    found = get_or_create_collection(db_session, "reading list")
+
+    assert created is not None
+    assert created.slug == "reading-list"
+    assert found is not None
+    assert found.id == created.id
+
+
+def test_get_or_create_tags_and_collections_dedupe_colliding_slugs(db_session):
+    """Test that names sharing a slug still get their own rows."""
+    c_tag = get_or_create_tags(db_session, ["c"])[0]
+    tags = get_or_create_tags(db_session, ["c++", "c#"])
+    c_collection = get_or_create_collection(db_session, "C")
+    cpp_collection = get_or_create_collection(db_session, "C++")
+
+    assert c_tag.slug == "c"
+    assert sorted(tag.name for tag in tags) == ["c#", "c++"]
+    assert sorted(tag.slug for tag in tags) == ["c-2", "c-3"]
+    assert c_collection is not None and cpp_collection is not None
+    assert cpp_collection.id != c_collection.id
+    assert cpp_collection.slug == "c-2"
+
+
+def test_delete_collection_detaches_links(db_session):
+    """Test that deleting a collection keeps its links and clears the reference."""
+    link = create_link(
+        db_session,
+        LinkCreate(url="https://example.com/a", notes="n", image_url="x", collection="Temp"),
+    )
+    collection = link.collection
+    delete_collection(db_session, collection)
+    db_session.commit()
+
+    db_session.expire_all()
+    reloaded = get_link(db_session, link.id)
+    assert reloaded is not None
+    assert reloaded.collection_id is None
+
+
+def test_list_links_search_matches_substrings(db_session):
+    """Test that search finds partial words regardless of case."""
+    create_link(
+        db_session,
+        LinkCreate(
+            url="https://example.com/guide", title="Gardening Guide", notes="n", image_url="x"
+        ),
+    )
+    create_link(
+        db_session,
+        LinkCreate(url="https://example.com/other", title="Cooking", notes="n", image_url="x"),
+    )
+    db_session.commit()
+
+    results, total = list_links(db_session, search="DENING")
+    assert total == 1
+    assert [link.title for link in results] == ["Gardening Guide"]
+
+
+def test_get_default_tags_cache_invalidated_on_update(db_session):
+    """Test that renaming a tag is reflected in cached default tags."""
+    ensure_default_tags(db_session)
+    db_session.commit()
+    first = get_default_tags(db_session, limit=2)
+
+    tag = get_tag(db_session, first[1].id)
+    update_tag(db_session, tag, "Insta Posts")
+    db_session.commit()
+
+    refreshed = get_default_tags(db_session, limit=2)
+    assert first[1].name == "Instagram"
+    assert "Instagram" not in [tag.name for tag in refreshed]
+
+
+def test_get_default_tags_refilled_mid_write_is_dropped_on_commit(db_session):
+    """Test that a reader caching old tags between a writer's flush and commit is not kept."""
+    ensure_default_tags(db_session)
+    db_session.commit()
+    tag = get_tag(db_session, get_default_tags(db_session, limit=2)[1].id)
+
+    update_tag(db_session, tag, "Insta Posts")
+    reader = SessionLocal()
+    try:
+        # The rename is flushed but uncommitted, so this read caches the old name
+        assert get_default_tags(reader, limit=2)[1].name == "Instagram"
+        db_session.commit()
+        reader.rollback()
+        assert "Instagram" not in [tag.name for tag in get_default_tags(reader, limit=2)]
+    finally:
+        reader.close()
+
+
+def test_list_all_collections_returns_rows_sorted_case_insensitively(db_session):
+    """Test that collection listings are plain rows ordered by lowercased name."""
+    get_or_create_collection(db_session, "beta")
+    get_or_create_collection(db_session, "Alpha")
+
+    rows = list_all_collections(db_session)
+    assert [row.name for row in rows] == ["Alpha", "beta"]
+    assert rows[0].slug == "alpha"
+
+
+def test_create_links_shares_tags_and_collections(db_session):
+    """Test that a batch of links reuses one tag and collection row per name."""
+    links = create_links(
+        db_session,
+        [
+            LinkCreate(url="https://example.com/1", tags=["Python", "web"], collection="Work"),
+            LinkCreate(url="https://example.com/2", tags=["python"], collection="work"),
+            LinkCreate(url="https://example.com/3"),
+        ],
+    )
+    db_session.commit()
+
+    assert all(link.id for link in links)
+    assert {tag.name for tag in links[0].tags} == {"python", "web"}
+    assert {tag.id for tag in links[1].tags} <= {tag.id for tag in links[0].tags}
+    assert links[0].collection is links[1].collection
+    assert links[2].collection is None and links[2].tags == []
+
+
+def test_load_links_sidebar_is_cached_until_the_next_commit(db_session):
+    """Test that the sidebar bundle lists collections with counts and is rebuilt after writes."""
+    create_link(db_session, LinkCreate(url="https://example.com/a", collection="beta"))
+    get_or_create_collection(db_session, "Alpha")
+    db_session.commit()
+
+    sidebar = load_links_sidebar(db_session)
+    assert [collection.name for collection in sidebar.collections] == ["Alpha", "beta"]
+    assert {collection.name: count for collection, count in sidebar.collection_summaries} == {
+        "Alpha": 0,
+        "beta": 1,
+    }
+    assert sidebar.has_broken_links is False
+    assert load_links_sidebar(db_session) is sidebar
+
+    get_or_create_collection(db_session, "gamma")
+    db_session.commit()
+    assert [collection.name for collection in load_links_sidebar(db_session).collections] == [
+        "Alpha",
+        "beta",
+        "gamma",
+    ]
+
+
+def test_delete_note_removes_its_image(db_session):
+    """Test that an uploaded note image is stored as bytes and removed with its note."""
+    image = create_note_image(db_session, b"\xff\xd8\xff", "image/jpeg")
+    note = create_note(
+        db_session, NoteCreate(title="Photo", content="c", image_url=note_image_url(image))
+    )
+    assert note.image_url == f"/images/{image.id}"
+
+    delete_note(db_session, note)
+    db_session.commit()
+    db_session.expire_all()
+    assert get_note_image(db_session, image.id) is None
+
+    # Image URLs are cached as immutable, so a new upload must not reuse the deleted id
+    replacement = create_note_image(db_session, b"\x89PNG", "image/png")
+    assert replacement.id > image.id
+
+
+def test_list_links_does_not_load_reverse_relationships(db_session):
+    """Test that loading a page of links leaves each tag's and collection's items unloaded."""
+    create_link(db_session, LinkCreate(url="https://one.com", tags=["shared"], collection="Col"))
+    create_link(db_session, LinkCreate(url="https://two.com", tags=["shared"], collection="Col"))
+    db_session.commit()
+    db_session.expunge_all()
+
+    links, _ = list_links(db_session, page_size=1)
+    unloaded_tags = inspect(links[0].tags[0]).unloaded
+    unloaded_collection = inspect(links[0].collection).unloaded
+    assert {"links", "notes"} <= unloaded_tags
+    assert {"links", "notes"} <= unloaded_collection
+
+
+def test_list_links_and_notes_eager_load_what_the_page_renders(db_session):
+    """Test that listed items expose tags and collection without further queries."""
+    create_link(db_session, LinkCreate(url="https://one.com", tags=["shared"], collection="Col"))
+    create_note(
+        db_session, NoteCreate(title="Note", content="c", tags=["shared"], collection="Col")
+    )
+    db_session.commit()
+    db_session.expunge_all()
+
+    links, _ = list_links(db_session)
+    notes, _ = list_notes(db_session)
+    # Detached rows raise on any lazy load, so these reads prove the data was loaded eagerly
+    db_session.expunge_all()
+    for item in [*links, *notes]:
+        assert [tag.name for tag in item.tags] == ["shared"]
+        assert item.collection.name == "Col"
+
+
+def test_delete_note_by_id_removes_note_and_image(db_session):
+    """Test that deleting by id cleans up the image and reports missing notes."""
+    image = create_note_image(db_session, b"\xff\xd8\xff", "image/jpeg")
+    note = create_note(
+        db_session, NoteCreate(title="Photo", content="c", image_url=note_image_url(image))
+    )
+    db_session.commit()
+
+    assert delete_note_by_id(db_session, note.id) is True
+    assert delete_note_by_id(db_session, note.id) is False
+    db_session.commit()
+    db_session.expire_all()
+    assert get_note_image(db_session, image.id) is None
+
+
+def test_list_notes_search_matches_substrings_after_edit(db_session):
+    """Test that note search finds partial words and follows edits to the note."""
+    note = create_note(db_session, NoteCreate(title="Gardening", content="Tomatoes and basil"))
+    create_note(db_session, NoteCreate(title="Cooking", content="Pasta"))
+    db_session.commit()
+
+    results, total = list_notes(db_session, search="MATOES")
+    assert total == 1
+    assert [found.title for found in results] == ["Gardening"]
+
+    update_note(db_session, note, NoteUpdate(content="Peppers"))
+    db_session.commit()
+    assert list_notes(db_session, search="matoes")[1] == 0
+    assert list_notes(db_session, search="pepper")[1] == 1
+
+
+def test_list_notes_date_range_includes_whole_end_day(db_session):
+    """Test that date_to keeps notes created later on the same day."""
+    note = create_note(db_session, NoteCreate(title="Evening", content="c"))
+    note.created_at = datetime(2024, 5, 1, 21, 30)
+    db_session.commit()
+
+    assert list_notes(db_session, date_from=date(2024, 5, 1), date_to=date(2024, 5, 1))[1] == 1
+    assert list_notes(db_session, date_to=date(2024, 4, 30))[1] == 0
+    assert parse_date_param("") is None
+    assert parse_date_param("2024-05-01") == date(2024, 5, 1)
@@ -0,0 +1,46 @@
+import io
+import os
+
+import anyio
+from PIL import Image, ImageFilter
+
+from app.image_utils import compress_image, compress_image_async, validate_image
+
+
+def _png_bytes(size=(800, 600)) -> bytes:
+    noise = Image.frombytes("RGB", size, os.urandom(size[0] * size[1] * 3))
+    img = noise.filter(ImageFilter.GaussianBlur(3))
+    output = io.BytesIO()
+    img.save(output, format="PNG")
+    return output.getvalue()
+
+
+def test_compress_image_fits_budget():
+    jpeg, content_type = compress_image(_png_bytes(), max_size_kb=100)
+    assert content_type == "image/jpeg"
+    assert len(jpeg) <= 100 * 1024
+    assert validate_image(jpeg)
+
+
+def test_validate_image_rejects_garbage():
+    assert validate_image(b"not an image") is False
+
+
+def test_compress_image_decodes_large_jpeg_at_reduced_scale():
+    source = Image.new("RGB", (4000, 3000), (120, 80, 40))
+    buffer = io.BytesIO()
+    source.save(buffer, format="JPEG")
+
+    jpeg, _ = compress_image(buffer.getvalue(), max_size_kb=100)
+    assert Image.open(io.BytesIO(jpeg)).size == (2000, 1500)
+
+
+def test_compress_image_async_matches_sync():
+    data = _png_bytes((200, 150))
+    assert anyio.run(compress_image_async, data, 100) == compress_image(data, max_size_kb=100)
+
+
+def test_validate_image_accepts_known_signature_without_decoding():
+    truncated_png = _png_bytes((20, 20))[:64]
+    assert validate_image(truncated_png) is True
+    assert validate_image(truncated_png, deep=True) is False
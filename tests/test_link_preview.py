@@ -0,0 +1,114 @@
+import asyncio
+
+import httpx
+
+from app import link_preview
+from app.link_preview import (
+    _extract_head_fields,
+    _extract_instagram_caption,
+    _parse_html,
+    _stream_head_fields,
+)
+
+PAGE = (
+    "<html><head><title> Page Title </title>"
+    '<meta property="og:title" content="">'
+    '<meta property="og:title" content="OG Title">'
+    '<meta name="description" content="Meta description">'
+    '<meta property="og:image" content="/cover.png">'
+    "</head><body><svg><title>Icon</title></svg></body></html>"
+)
+
+
+def test_extract_head_fields_keeps_first_non_empty_value():
+    fields = _extract_head_fields(PAGE.encode())
+    assert fields == {
+        "title": "Page Title",
+        "og:title": "OG Title",
+        "description": "Meta description",
+        "og:image": "/cover.png",
+    }
+
+
+def test_extract_head_fields_uses_meta_charset_then_utf8():
+    latin = '<meta charset="iso-8859-1">' + PAGE.replace("Page Title", "Café")
+    assert _extract_head_fields(latin.encode("iso-8859-1"))["title"] == "Café"
+    utf8 = PAGE.replace("Page Title", "Café")
+    assert _extract_head_fields(utf8.encode())["title"] == "Café"
+
+
+def test_stream_head_fields_stops_at_end_of_head():
+    body_chunks_read = []
+
+    async def chunks():
+        yield PAGE.encode()[:40]
+        yield PAGE.encode()[40:]
+        body_chunks_read.append(True)
+        yield b'<meta property="og:description" content="Too late">'
+
+    response = httpx.Response(200, content=chunks())
+    fields = asyncio.run(_stream_head_fields(response))
+
+    assert fields == _extract_head_fields(PAGE.encode())
+    assert body_chunks_read == []
+
+
+def test_fetch_link_metadata_caches_successful_previews(monkeypatch):
+    calls = []
+
+    async def fake_fetch(url, timeout, validators=None):
+        calls.append(url)
+        return {"title": "T", "is_accessible": "/ok" in url}, {}
+
+    monkeypatch.setattr(link_preview, "_fetch_link_metadata_uncached", fake_fetch)
+    link_preview.clear_preview_cache()
+
+    first = asyncio.run(link_preview.fetch_link_metadata("https://Example.com/ok#top"))
+    first["title"] = "mutated"
+    second = asyncio.run(link_preview.fetch_link_metadata("https://example.com/ok"))
+    asyncio.run(link_preview.fetch_link_metadata("https://example.com/down"))
+    asyncio.run(link_preview.fetch_link_metadata("https://example.com/down"))
+
+    assert second["title"] == "T"
+    assert calls == [
+        "https://Example.com/ok#top",
+        "https://example.com/down",
+        "https://example.com/down",
+    ]
+    link_preview.clear_preview_cache()
+
+
+def test_fetch_link_metadata_revalidates_expired_preview(monkeypatch):
+    seen_etags = []
+
+    def handler(request):
+        seen_etags.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(200, headers={"ETag": '"v1"'}, content=PAGE.encode())
+
+    monkeypatch.setitem(link_preview._CLIENT_OPTIONS, "transport", httpx.MockTransport(handler))
+    link_preview.clear_preview_cache()
+
+    first = asyncio.run(link_preview.fetch_link_metadata("https://example.com/page"))
+    # Expire the entry so the next call goes back to the server
+    key = link_preview._preview_cache_key("https://example.com/page")
+    _, metadata, validators = link_preview._preview_cache[key]
+    link_preview._preview_cache[key] = (0.0, metadata, validators)
+    second = asyncio.run(link_preview.fetch_link_metadata("https://example.com/page"))
+
+    assert seen_etags == [None, '"v1"']
+    assert second == first
+    assert second["title"] == "OG Title"
+    assert link_preview._preview_cache[key][0] > 0.0
+    link_preview.clear_preview_cache()
+
+
+def test_extract_instagram_caption_returns_quoted_text():
+    root = _parse_html(
+        b"<html><body>"
+        b'<div class="_aade _ap3a _aaco _aacu _aacx _aad7"><b>someone</b> "Post text"</div>'
+        b'<div class="_ap3a">"Unrelated"</div>'
+        b"</body></html>"
+    )
+    assert _extract_instagram_caption(root) == "Post text"
@@ -0,0 +1,117 @@
+"""Tests for replaying the SQLite migrations against databases created by older releases."""
+
+import sqlite3
+
+from sqlalchemy import create_engine
+
+from app.database import Base
+from app.migrations import run_migrations
+from app.migrations.utils import has_column
+
+
+def _create_database(path, drop_columns):
+    """Create the current schema, then drop columns to mimic a database from an older release."""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    for table, column in drop_columns:
+        conn.execute(f"DROP INDEX IF EXISTS ix_{table}_{column}")
+        conn.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+    conn.commit()
+    return conn
+
+
+def test_run_migrations_adds_name_lower_columns(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = _create_database(path, [("tags", "name_lower"), ("collections", "name_lower")])
+    conn.execute("INSERT INTO tags (name, slug) VALUES ('Python', 'python')")
+    conn.commit()
+    conn.close()
+
+    run_migrations(path)
+    # A second run finds every migration recorded and changes nothing
+    run_migrations(path)
+
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    assert has_column(cursor, "collections", "name_lower")
+    assert cursor.execute("SELECT name_lower FROM tags").fetchall() == [("python",)]
+    conn.close()
+
+
+def test_run_migrations_adds_and_backfills_search_columns(tmp_path):
+    path = str(tmp_path / "old.db")
+    search_columns = [("links", "title_lower"), ("links", "url_lower"), ("links", "notes_lower")]
+    conn = _create_database(path, search_columns)
+    conn.execute(
+        "INSERT INTO links (url, title, notes) "
+        "VALUES ('https://Example.com', 'Ünïcode Title', NULL)"
+    )
+    conn.commit()
+    conn.close()
+
+    run_migrations(path)
+
+    conn = sqlite3.connect(path)
+    row = conn.execute("SELECT title_lower, url_lower, notes_lower FROM links").fetchone()
+    assert row == ("ünïcode title", "https://example.com", None)
+    conn.close()
+
+
+def test_run_migrations_backfills_normalized_urls(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = _create_database(path, [("links", "normalized_url")])
+    conn.execute("INSERT INTO links (url, title) VALUES ('https://example.com/?utm_source=x', 't')")
+    conn.commit()
+    conn.close()
+
+    run_migrations(path)
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT normalized_url FROM links").fetchone() == ("https://example.com/",)
+    conn.close()
+
+
+def test_run_migrations_refreshes_normalized_urls_from_older_rule(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = _create_database(path, [])
+    # Older releases re-encoded the remaining query, turning %20 into +
+    conn.execute(
+        "INSERT INTO links (url, normalized_url, title) "
+        "VALUES ('https://x.com/p?q=a%20b&utm_source=z', 'https://x.com/p?q=a+b', 't')"
+    )
+    conn.commit()
+    conn.close()
+
+    run_migrations(path)
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT normalized_url FROM links").fetchone() == ("https://x.com/p?q=a%20b",)
+    conn.close()
+
+
+def test_run_migrations_rebuilds_note_images_with_autoincrement(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = _create_database(path, [])
+    conn.execute("DROP TABLE note_images")
+    conn.execute(
+        "CREATE TABLE note_images (id INTEGER NOT NULL PRIMARY KEY, data BLOB NOT NULL, "
+        "content_type VARCHAR(50) NOT NULL, created_at DATETIME, updated_at DATETIME)"
+    )
+    conn.execute("INSERT INTO note_images (id, data, content_type) VALUES (1, x'00', 'image/png')")
+    conn.execute("INSERT INTO note_images (id, data, content_type) VALUES (2, x'01', 'image/png')")
+    conn.commit()
+    conn.close()
+
+    run_migrations(path)
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT id FROM note_images ORDER BY id").fetchall() == [(1,), (2,)]
+    conn.execute("DELETE FROM note_images WHERE id = 2")
+    new_id = conn.execute(
+        "INSERT INTO note_images (data, content_type) VALUES (x'02', 'image/png')"
+    ).lastrowid
+    assert new_id == 3
+    conn.close()
@@ -1,6 +1,12 @@
+import asyncio
 from types import SimpleNamespace
 
-from app.tasks import needs_title_refresh
+from fastapi import BackgroundTasks
+
+from app import tasks
+from app.crud import create_link, get_link
+from app.schemas import LinkCreate
+from app.tasks import needs_metadata_refresh, needs_title_refresh
 
 
 def test_needs_title_refresh_when_title_matches_url():
@@ -16,3 +22,75 @@ def test_needs_title_refresh_when_title_missing():
 def test_needs_title_refresh_when_title_differs():
     link = SimpleNamespace(url="https://example.com", title="Custom Title")
     assert needs_title_refresh(link) is False
+
+
+def test_needs_metadata_refresh_when_notes_missing():
+    link = SimpleNamespace(
+        url="https://example.com", title="Custom Title", image_url="x", notes=None
+    )
+    assert needs_metadata_refresh(link) is True
+
+
+def test_create_link_defers_metadata_to_refresh(db_session, monkeypatch):
+    calls = []
+
+    def fake_fetch(url):
+        calls.append(url)
+        return {"title": "Example", "image": "https://example.com/og.png", "description": "About"}
+
+    monkeypatch.setattr(tasks, "_fetch_metadata_sync", fake_fetch)
+
+    link = create_link(db_session, LinkCreate(url="https://example.com/page"))
+    db_session.commit()
+    assert calls == []
+    assert link.image_check_status == "pending"
+
+    tasks.refresh_link_metadata(link.id)
+
+    db_session.expire_all()
+    refreshed = get_link(db_session, link.id)
+    assert calls == ["https://example.com/page"]
+    assert refreshed.title == "Example"
+    assert refreshed.image_url == "https://example.com/og.png"
+    assert refreshed.image_check_status == "success"
+    assert refreshed.notes == "About"
+
+
+def test_refresh_worker_batches_queued_links(db_session, monkeypatch):
+    fetched = []
+
+    async def fake_fetch(url):
+        fetched.append(url)
+        return {"title": f"Title for {url}", "image": None, "description": "About"}
+
+    monkeypatch.setattr(tasks, "fetch_link_metadata", fake_fetch)
+    first = create_link(db_session, LinkCreate(url="https://example.com/one"))
+    second = create_link(db_session, LinkCreate(url="https://example.com/two", title="Kept"))
+    db_session.commit()
+
+    async def run_worker():
+        await tasks.start_refresh_worker()
+        try:
+            tasks.schedule_metadata_refresh(BackgroundTasks(), first.id)
+            tasks.schedule_metadata_refresh(BackgroundTasks(), second.id, title_only=True)
+            await asyncio.sleep(0)
+            await tasks._refresh_queue.join()
+        finally:
+            await tasks.stop_refresh_worker()
+
+    asyncio.run(run_worker())
+
+    db_session.expire_all()
+    assert fetched == ["https://example.com/one"]
+    assert get_link(db_session, first.id).title == "Title for https://example.com/one"
+    assert get_link(db_session, first.id).notes == "About"
+    assert get_link(db_session, second.id).title == "Kept"
+
+
+def test_schedule_metadata_refresh_falls_back_to_background_tasks():
+    background_tasks = BackgroundTasks()
+    tasks.schedule_metadata_refresh(background_tasks, 7, title_only=True)
+
+    assert [task.func for task in background_tasks.tasks] == [
+        tasks.refresh_link_title_if_placeholder
+    ]
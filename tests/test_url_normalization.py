@@ -141,3 +141,21 @@ def test_original_url_preserved_in_database(db_session):
     found = get_link_by_url(db_session, similar_url)
     assert found is not None
     assert found.id == created.id
+
+
+def test_normalize_url_without_utm_returned_unchanged():
+    """Test that query strings without UTM parameters are left untouched."""
+    url = "https://example.com/search?q=a+b&page=2#results"
+    assert normalize_url(url) == url
+
+
+def test_normalize_url_keeps_encoding_of_other_params():
+    """Test that stripping UTM parameters leaves percent-encoding of the rest intact."""
+    url = "https://x.com/p?q=a%20b&utm_source=z"
+    assert normalize_url(url) == "https://x.com/p?q=a%20b"
+
+
+def test_normalize_url_keeps_order_of_repeated_params():
+    """Test that repeated keys keep their original positions."""
+    url = "https://x.com/p?b=2&a=1&b=3&utm_medium=x"
+    assert normalize_url(url) == "https://x.com/p?b=2&a=1&b=3"